@@ -10,7 +10,7 @@ TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 def enviar_mensaje_telegram(mensaje):
-    """Envía un mensaje al canal o chat de Telegram."""
+    """Envía un mensaje al canal o chat de Telegram. Devuelve si Telegram lo aceptó."""
     url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
     payload = {
         'chat_id': TELEGRAM_CHAT_ID,
@@ -22,9 +22,10 @@ def enviar_mensaje_telegram(mensaje):
         response.raise_for_status()  
         if response.status_code == 200:
             print("Mensaje enviado exitosamente a Telegram.")
-        else:
-            print(f"Error al enviar el mensaje a Telegram. Código de respuesta: {response.status_code}")
-            print(f"Respuesta del servidor: {response.text}")
+            return True
+        print(f"Error al enviar el mensaje a Telegram. Código de respuesta: {response.status_code}")
+        print(f"Respuesta del servidor: {response.text}")
     except requests.exceptions.RequestException as e:
         print(f"Excepción al enviar el mensaje: {e}")
+    return False
 
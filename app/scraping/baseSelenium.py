@@ -1,20 +1,20 @@
-from selenium.webdriver import Chrome
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium import webdriver
+from perfilScraping import iniciar_chrome
+from resolverDriver import servicio_chrome
 import time
 
 def main():
 
     #configuracion para abrir la web.
-    service = Service(ChromeDriverManager().install())
+    service = servicio_chrome()
     option = webdriver.ChromeOptions()
 
     #corre la web como "minimizada."
     #option.add_argument("--headless")
 
     option.add_argument("--window-size=1920,1080")
-    driver = Chrome(service=service, options=option)
+    # Carga eager y sin imágenes, fuentes ni scripts de terceros (headless=True para ocultarla)
+    driver = iniciar_chrome(service, option, headless=False)
 
     driver.get("#") #link completo de la web.
     time.sleep(5)
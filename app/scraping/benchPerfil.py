@@ -0,0 +1,130 @@
+"""
+Compara el tiempo de carga y los bytes transferidos de un Chrome común contra el perfil de scraping.
+
+Uso:
+    python benchPerfil.py                      # URLs de las tiendas de preciosCafes/tiendas.json
+    python benchPerfil.py https://... https://...
+Variables: BENCH_REPETICIONES (3), BENCH_ESPERA (segundos que se deja cargar la página antes de medir bytes, 2).
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+from selenium import webdriver
+
+from perfilScraping import iniciar_chrome
+from resolverDriver import servicio_chrome
+
+REPETICIONES = int(os.getenv("BENCH_REPETICIONES", "3"))
+ESPERA = float(os.getenv("BENCH_ESPERA", "2"))
+TIENDAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preciosCafes", "tiendas.json")
+
+# Navigation Timing sólo para el DOM listo. Los bytes salen del log de performance de Chrome
+# (Network.loadingFinished.encodedDataLength): transferSize de Resource Timing da 0 para los
+# recursos de otros dominios sin Timing-Allow-Origin, justo los CDN y analytics que el perfil bloquea.
+SCRIPT_DOM_LISTO = "return (performance.getEntriesByType('navigation')[0] || {}).domContentLoadedEventEnd || 0;"
+
+
+def urls_tiendas():
+    with open(TIENDAS_PATH, "r", encoding="utf-8") as f:
+        return [tienda["urls"][0] for tienda in json.load(f)]
+
+
+def opciones_medicion():
+    options = webdriver.ChromeOptions()
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def chrome_comun(service):
+    options = opciones_medicion()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(service=service, options=options)
+
+
+def chrome_perfil(service):
+    options = opciones_medicion()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return iniciar_chrome(service, options)
+
+
+def medir(driver, url):
+    # Sin cache del navegador: cada repetición es una carga en frío, como la de un driver nuevo
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    driver.get_log("performance")  # descarta los eventos de la carga anterior
+    inicio = time.perf_counter()
+    driver.get(url)
+    get_ms = (time.perf_counter() - inicio) * 1000
+    time.sleep(ESPERA)
+    bytes_red, recursos = bytes_descargados(driver.get_log("performance"))
+    dom_listo_ms = driver.execute_script(SCRIPT_DOM_LISTO)
+    return {"get_ms": get_ms, "dom_listo_ms": dom_listo_ms, "bytes": bytes_red, "recursos": recursos}
+
+
+def bytes_descargados(entradas):
+    """Bytes recibidos de la red (comprimidos, con headers) y cantidad de recursos terminados."""
+    total, recursos = 0, 0
+    for entrada in entradas:
+        mensaje = json.loads(entrada["message"])["message"]
+        if mensaje["method"] == "Network.loadingFinished":
+            total += mensaje["params"].get("encodedDataLength", 0)
+            recursos += 1
+    return total, recursos
+
+
+def correr(nombre, crear, service, urls):
+    driver = crear(service)
+    resultados = {}
+    try:
+        for url in urls:
+            medidas = []
+            for _ in range(REPETICIONES):
+                try:
+                    medidas.append(medir(driver, url))
+                except Exception as e:
+                    print(f"Error al medir {url} ({nombre}): {e}")
+            if medidas:
+                resultados[url] = {
+                    clave: statistics.median(medida[clave] for medida in medidas)
+                    for clave in ("get_ms", "dom_listo_ms", "bytes", "recursos")
+                }
+    finally:
+        driver.quit()
+    return resultados
+
+
+def main():
+    urls = sys.argv[1:] or urls_tiendas()
+    service = servicio_chrome()
+    comun = correr("común", chrome_comun, service, urls)
+    perfil = correr("perfil", chrome_perfil, service, urls)
+
+    print(f"{'URL':<55} {'get común':>10} {'get perfil':>10} {'KB común':>10} {'KB perfil':>10} {'recursos':>12}")
+    for url in urls:
+        if url not in comun or url not in perfil:
+            continue
+        a, b = comun[url], perfil[url]
+        print(
+            f"{url[:55]:<55} {a['get_ms']:>8.0f}ms {b['get_ms']:>8.0f}ms "
+            f"{a['bytes'] / 1024:>10.0f} {b['bytes'] / 1024:>10.0f} "
+            f"{a['recursos']:>5.0f} → {b['recursos']:<4.0f}"
+        )
+
+    medidas = [url for url in urls if url in comun and url in perfil]
+    if medidas:
+        get_comun = sum(comun[url]["get_ms"] for url in medidas)
+        get_perfil = sum(perfil[url]["get_ms"] for url in medidas)
+        bytes_comun = sum(comun[url]["bytes"] for url in medidas)
+        bytes_perfil = sum(perfil[url]["bytes"] for url in medidas)
+        print(f"\nTotal: get {get_comun:.0f}ms → {get_perfil:.0f}ms, "
+              f"{bytes_comun / 1024:.0f}KB → {bytes_perfil / 1024:.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,7 @@
 import requests
 import os
+import sys
 from dotenv import load_dotenv
-from selenium.webdriver import Chrome
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
@@ -12,6 +10,11 @@ import schedule
 import time
 import logging
 
+# Perfil de scraping compartido (app/scraping)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from perfilScraping import iniciar_chrome
+from resolverDriver import servicio_chrome
+
 # Cargar las variables de entorno desde el archivo .env
 load_dotenv(dotenv_path='/home/tobi/develop/scraping/.env.local')  
 
@@ -42,11 +45,11 @@ def enviar_mensaje_telegram(mensaje):
         print(f"Excepción al enviar el mensaje: {e}")
 
 def setup_driver():
-    service = Service(ChromeDriverManager().install())
+    service = servicio_chrome()
     options = webdriver.ChromeOptions()
     options.add_argument("--window-size=1250,850")
-    options.add_argument("--headless")  
-    return Chrome(service=service, options=options)
+    # Headless, carga eager y sin imágenes, fuentes ni scripts de terceros
+    return iniciar_chrome(service, options)
 
 def login(driver):
     driver.get("https://serviclub.com.ar/4633-espectaculos-")
@@ -0,0 +1,84 @@
+import os
+
+from selenium import webdriver
+
+# Perfil compartido para los navegadores que sólo leen texto de una página (precios, entradas, etc.).
+# Lo pesado de estas páginas son imágenes, fuentes, analytics y widgets de chat: nada de eso hace falta.
+
+# SCRAPING_BLOQUEAR_RECURSOS=0 desactiva los bloqueos (ej. para comparar en benchPerfil.py)
+BLOQUEAR_RECURSOS = os.getenv("SCRAPING_BLOQUEAR_RECURSOS", "1") != "0"
+
+# Patrones de URL bloqueados por tipo de recurso (comodines de Network.setBlockedURLs).
+# Terminan en "*" para que también coincidan con query strings: "fuente.woff2?v=4.7.0"
+EXTENSIONES_BLOQUEADAS = [
+    # Imágenes
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*", "*.bmp*",
+    # Video y audio
+    "*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.ogg*",
+    # Fuentes
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+]
+
+# Dominios de terceros (analytics, publicidad, chats) bloqueados; se pueden reemplazar con
+# SCRAPING_DOMINIOS_BLOQUEADOS="dominio1.com,dominio2.com"
+DOMINIOS_BLOQUEADOS_POR_DEFECTO = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "facebook.com/tr",
+    "hotjar.com",
+    "clarity.ms",
+    "analytics.tiktok.com",
+    "tawk.to",
+    "zopim.com",
+    "jivosite.com",
+    "widget.whatsapp.com",
+    "youtube.com/embed",
+]
+DOMINIOS_BLOQUEADOS = [
+    dominio.strip()
+    for dominio in os.getenv("SCRAPING_DOMINIOS_BLOQUEADOS", ",".join(DOMINIOS_BLOQUEADOS_POR_DEFECTO)).split(",")
+    if dominio.strip()
+]
+
+
+def urls_bloqueadas():
+    return EXTENSIONES_BLOQUEADAS + [f"*{dominio}*" for dominio in DOMINIOS_BLOQUEADOS]
+
+
+def opciones_scraping(options=None, headless=True):
+    """
+    Agrega el perfil de scraping a unas ChromeOptions (o crea unas nuevas):
+    carga "eager" (no espera imágenes ni iframes), sin extensiones ni tráfico de fondo y sin imágenes.
+    """
+    options = options or webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-background-networking")
+    # driver.get vuelve con el DOM listo, sin esperar imágenes, hojas de estilo ni iframes
+    options.page_load_strategy = "eager"
+    if BLOQUEAR_RECURSOS:
+        # Respaldo de los bloqueos por CDP: Chrome ni siquiera pide las imágenes
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+
+def aplicar_bloqueos(driver):
+    """Bloquea por CDP las URLs de urls_bloqueadas(). Se llama una vez por navegador, antes del primer get."""
+    if not BLOQUEAR_RECURSOS:
+        return driver
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls_bloqueadas()})
+    except Exception as e:
+        print(f"Error al aplicar los bloqueos del perfil de scraping: {e}")
+    return driver
+
+
+def iniciar_chrome(service, options=None, headless=True):
+    """Abre un Chrome con el perfil de scraping ya aplicado."""
+    driver = webdriver.Chrome(service=service, options=opciones_scraping(options, headless=headless))
+    return aplicar_bloqueos(driver)
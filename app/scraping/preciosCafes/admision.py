@@ -0,0 +1,116 @@
+import os
+import threading
+from contextlib import contextmanager
+
+# Navegadores abiertos a la vez y cuántos pedidos pueden esperar turno antes de rechazar
+ADMISION_MAX_ACTIVOS = int(os.getenv("ADMISION_MAX_ACTIVOS", os.getenv("DRIVER_POOL_SIZE", "6")))
+ADMISION_MAX_COLA = int(os.getenv("ADMISION_MAX_COLA", "12"))
+ADMISION_ESPERA = float(os.getenv("ADMISION_ESPERA", "30"))
+# Segundos sugeridos al cliente en el header Retry-After
+ADMISION_RETRY_AFTER = int(os.getenv("ADMISION_RETRY_AFTER", "30"))
+
+
+class Saturado(Exception):
+    """No hay lugar para otra sesión de navegador; el cliente debe reintentar más tarde."""
+
+    def __init__(self, mensaje, retry_after=ADMISION_RETRY_AFTER):
+        super().__init__(mensaje)
+        self.retry_after = retry_after
+
+
+class _Llamada:
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave: la primera ejecuta la función
+    y las demás esperan y reciben el mismo resultado (o la misma excepción).
+    """
+
+    def __init__(self):
+        self._en_vuelo = {}
+        self._lock = threading.Lock()
+
+    def hacer(self, clave, funcion):
+        with self._lock:
+            llamada = self._en_vuelo.get(clave)
+            lider = llamada is None
+            if lider:
+                llamada = _Llamada()
+                self._en_vuelo[clave] = llamada
+
+        if not lider:
+            llamada.evento.wait()
+            if llamada.error:
+                raise llamada.error
+            return llamada.resultado
+
+        try:
+            llamada.resultado = funcion()
+            return llamada.resultado
+        except Exception as e:
+            llamada.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_vuelo[clave]
+            llamada.evento.set()
+
+    def en_vuelo(self):
+        with self._lock:
+            return list(self._en_vuelo)
+
+
+class ControlAdmision:
+    """
+    Semáforo global de sesiones de navegador con una cola de espera acotada.
+    Si la cola está llena, o el turno no llega a tiempo, se levanta Saturado en vez de apilar pedidos.
+    """
+
+    def __init__(self, max_activos=ADMISION_MAX_ACTIVOS, max_cola=ADMISION_MAX_COLA, espera=ADMISION_ESPERA):
+        self.max_activos = max_activos
+        self.max_cola = max_cola
+        self.espera = espera
+        self._semaforo = threading.BoundedSemaphore(max_activos)
+        self._activos = 0
+        self._en_cola = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def admitir(self):
+        if not self._semaforo.acquire(blocking=False):
+            self._esperar_turno()
+        with self._lock:
+            self._activos += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._activos -= 1
+            self._semaforo.release()
+
+    def _esperar_turno(self):
+        with self._lock:
+            if self._en_cola >= self.max_cola:
+                raise Saturado(f"Hay {self._en_cola} pedidos esperando un navegador")
+            self._en_cola += 1
+        try:
+            obtenido = self._semaforo.acquire(timeout=self.espera)
+        finally:
+            with self._lock:
+                self._en_cola -= 1
+        if not obtenido:
+            raise Saturado(f"No se liberó ningún navegador en {self.espera}s")
+
+    def estado(self):
+        with self._lock:
+            return {
+                "max_activos": self.max_activos,
+                "activos": self._activos,
+                "en_cola": self._en_cola,
+                "max_cola": self.max_cola,
+            }
@@ -0,0 +1,114 @@
+"""
+Benchmark de los extractores contra las fixtures grabadas (ver fixturesTiendas.py), sin red.
+
+Corre cada tienda del registro con el motor HTML (requests + parser), con su API si la tiene
+(motorApi.py) y con Selenium (la misma Tienda.buscar_selenium que usan los search_* de
+scrapPaginasCafe/), y reporta productos, tiempo, productos/segundo y memoria.
+
+Uso:
+    python benchExtractores.py [--sin-selenium] [tienda ...]
+Variables: BENCH_REPETICIONES (3), FIXTURES_DIR, FIXTURES_LATENCIA (simula la red, en segundos).
+"""
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from driverPool import rss_proceso_mb
+from fixturesTiendas import Fixtures, abrir_navegador, clave_fixture, iniciar_servidor, tiendas_locales
+from registroTiendas import REGISTRO
+
+REPETICIONES = int(os.getenv("BENCH_REPETICIONES", "3"))
+
+
+def medir_html(tienda, buscar=None):
+    """Motores sin navegador (HTML o API): memoria pico de Python con tracemalloc."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    products = (buscar or tienda.buscar_html)()
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"productos": len(products), "segundos": duracion, "memoria_mb": pico / 1024 / 1024}
+
+
+def medir_selenium(tienda, driver):
+    inicio = time.perf_counter()
+    products = tienda.buscar_selenium(driver)
+    duracion = time.perf_counter() - inicio
+    # Memoria residente de chromedriver y todos los procesos de Chrome
+    memoria = rss_proceso_mb(driver.service.process.pid)
+    return {"productos": len(products), "segundos": duracion, "memoria_mb": memoria}
+
+
+def resumir(medidas):
+    segundos = statistics.median(medida["segundos"] for medida in medidas)
+    productos = medidas[-1]["productos"]
+    return {
+        "productos": productos,
+        "segundos": segundos,
+        "productos_por_segundo": productos / segundos if segundos else 0,
+        "memoria_mb": max(medida["memoria_mb"] for medida in medidas),
+    }
+
+
+def correr(tiendas, con_selenium=True):
+    resultados = []
+    driver = abrir_navegador() if con_selenium else None
+    try:
+        for tienda in tiendas:
+            modos = [("html", lambda: medir_html(tienda))]
+            if tienda.api:
+                modos.append(("api", lambda: medir_html(tienda, tienda.buscar_api)))
+            if driver:
+                modos.append(("selenium", lambda: medir_selenium(tienda, driver)))
+            for motor, medir in modos:
+                medidas = []
+                for _ in range(REPETICIONES):
+                    try:
+                        medidas.append(medir())
+                    except Exception as e:
+                        print(f"Error al medir {tienda.id} ({motor}): {e}")
+                        break
+                if medidas:
+                    resultados.append({"tienda": tienda.id, "motor": motor, **resumir(medidas)})
+    finally:
+        if driver:
+            driver.quit()
+    return resultados
+
+
+def imprimir(resultados):
+    print(f"{'tienda':<18} {'motor':<9} {'productos':>9} {'tiempo':>10} {'prod/s':>9} {'memoria':>10}")
+    for resultado in resultados:
+        print(
+            f"{resultado['tienda']:<18} {resultado['motor']:<9} {resultado['productos']:>9} "
+            f"{resultado['segundos'] * 1000:>8.0f}ms {resultado['productos_por_segundo']:>9.0f} "
+            f"{resultado['memoria_mb']:>8.1f}MB"
+        )
+
+
+def main():
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+    con_selenium = "--sin-selenium" not in sys.argv
+
+    fixtures = Fixtures()
+    if not fixtures.indice:
+        print(f"No hay fixtures en {fixtures.directorio}; grabalas con: python fixturesTiendas.py grabar")
+        return
+    servidor, base = iniciar_servidor(fixtures=fixtures)
+    try:
+        # Sólo las tiendas que tienen grabado su primer listado
+        tiendas = [
+            tienda for tienda in tiendas_locales(base).values()
+            if (not argumentos or tienda.id in argumentos)
+            and clave_fixture(REGISTRO[tienda.id].urls[0]) in fixtures.indice
+        ]
+        imprimir(correr(tiendas, con_selenium))
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from catalogo import id_publico
+
+# Fracción mínima de los trigramas de la consulta que tiene que contener un nombre para ser resultado
+BUSQUEDA_PUNTAJE_MINIMO = 0.5
+
+
+def plegar(texto):
+    """Minúsculas, sin tildes y sin signos: "Etiopía Natural" -> "etiopia natural"."""
+    sin_tildes = unicodedata.normalize("NFKD", texto)
+    sin_tildes = "".join(c for c in sin_tildes if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", sin_tildes.lower()).strip()
+
+
+def trigramas(texto):
+    """
+    Trigramas de cada palabra, con bordes marcados para que el comienzo y el final pesen.
+    Un error de tipeo sólo cambia unos pocos trigramas, por eso la búsqueda tolera typos.
+    """
+    resultado = set()
+    for palabra in plegar(texto).split():
+        marcada = f"  {palabra} "
+        for i in range(len(marcada) - 2):
+            resultado.add(marcada[i:i + 3])
+    return resultado
+
+
+class IndiceBusqueda:
+    """
+    Índice invertido trigrama -> productos sobre los nombres del catálogo.
+    Se actualiza por tienda: al refrescarse una tienda sólo se tocan sus productos.
+    """
+
+    def __init__(self, puntaje_minimo=BUSQUEDA_PUNTAJE_MINIMO):
+        self.puntaje_minimo = puntaje_minimo
+        self._productos = {}
+        self._trigramas = {}
+        self._por_tienda = defaultdict(set)
+        self._invertido = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def actualizar_tienda(self, tienda, products):
+        nuevos = {}
+        for product in products:
+            product_id = id_publico(product["url"])
+            nuevos[product_id] = {**product, "id": product_id, "shop": tienda}
+
+        with self._lock:
+            anteriores = self._por_tienda[tienda]
+            for product_id in anteriores - nuevos.keys():
+                self._quitar(product_id)
+            for product_id, product in nuevos.items():
+                if product_id in self._productos and self._productos[product_id]["name"] == product["name"]:
+                    # Mismo nombre: los trigramas no cambian, sólo el precio u otros datos
+                    self._productos[product_id] = product
+                    continue
+                self._quitar(product_id)
+                self._agregar(product_id, product)
+            self._por_tienda[tienda] = set(nuevos)
+
+    def buscar(self, consulta, limit=20):
+        """Productos ordenados por similitud con la consulta (mayor puntaje primero)."""
+        buscados = trigramas(consulta)
+        if not buscados:
+            return []
+
+        with self._lock:
+            comunes = defaultdict(int)
+            for trigrama in buscados:
+                for product_id in self._invertido.get(trigrama, ()):
+                    comunes[product_id] += 1
+
+            # Puntaje: cuánto de la consulta aparece en el nombre. A igual cobertura gana el nombre
+            # más parecido en largo (coeficiente de Dice), así "brasil" prefiere "Brasil" a un nombre largo.
+            resultados = []
+            for product_id, cantidad in comunes.items():
+                cobertura = cantidad / len(buscados)
+                if cobertura < self.puntaje_minimo:
+                    continue
+                dice = 2 * cantidad / (len(buscados) + len(self._trigramas[product_id]))
+                resultados.append((cobertura, dice, self._productos[product_id]))
+
+        resultados.sort(key=lambda resultado: (-resultado[0], -resultado[1], resultado[2]["price"]))
+        return [{**product, "score": round(cobertura, 3)} for cobertura, _, product in resultados[:limit]]
+
+    def _agregar(self, product_id, product):
+        propios = trigramas(product["name"])
+        self._productos[product_id] = product
+        self._trigramas[product_id] = propios
+        for trigrama in propios:
+            self._invertido[trigrama].add(product_id)
+
+    def _quitar(self, product_id):
+        for trigrama in self._trigramas.pop(product_id, ()):
+            ids = self._invertido.get(trigrama)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._invertido[trigrama]
+        self._productos.pop(product_id, None)
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+
+# Tiempo (segundos) que un catálogo se considera fresco. Los precios cambian pocas veces al día.
+CACHE_TTL = int(os.getenv("PRICE_CACHE_TTL", "21600"))
+
+# Directorio para los datos que deben sobrevivir a un reinicio del contenedor
+CACHE_DIR = os.getenv("PRICE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+CACHE_PATH = os.path.join(CACHE_DIR, "precios.json")
+
+
+class CachePrecios:
+    """
+    Cache en memoria de productos por tienda, con TTL y stale-while-revalidate.
+
+    - Entrada fresca: se devuelve directamente.
+    - Entrada vencida: se devuelve igual y se refresca en segundo plano.
+    - Sin entrada (o refresh=True): se scrapea en el momento.
+
+    Cada actualización se persiste en disco para que un reinicio arranque con el último catálogo.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, path=CACHE_PATH):
+        self.ttl = ttl
+        self.path = path
+        self._entradas = {}
+        self._refrescando = set()
+        self._suscriptores = []
+        self._lock = threading.Lock()
+        self._cargar()
+
+    def suscribir(self, callback):
+        """
+        Registra callback(tienda, products), que se llama cada vez que se guarda el catálogo de una tienda.
+        Se llama enseguida con lo que ya hay en cache (ej. lo leído de disco al arrancar).
+        """
+        self._suscriptores.append(callback)
+        for tienda, entrada in list(self._entradas.items()):
+            callback(tienda, entrada["products"])
+
+    def obtener(self, tienda, loader, refresh=False):
+        """
+        Devuelve (productos, estado), con estado "hit", "stale", "miss" o "refresh".
+        `loader` es una función sin argumentos que scrapea la tienda.
+        """
+        entrada = self._entradas.get(tienda)
+
+        if refresh or entrada is None:
+            products = self._cargar_tienda(tienda, loader)
+            if not products and entrada is not None:
+                # El scrape falló: mejor el último catálogo conocido que nada
+                return entrada["products"], "stale"
+            return products, "refresh" if refresh else "miss"
+
+        if time.time() - entrada["actualizado"] > self.ttl:
+            self._refrescar_en_segundo_plano(tienda, loader)
+            return entrada["products"], "stale"
+
+        return entrada["products"], "hit"
+
+    def leer(self, tienda):
+        """
+        Como obtener() pero sin scrapear nunca, para cuando otro (el calentador) mantiene la cache al día.
+        Devuelve (productos, estado) con estado "hit", "stale" o "pendiente" (todavía no hay catálogo).
+        """
+        entrada = self._entradas.get(tienda)
+        if entrada is None:
+            return [], "pendiente"
+        if time.time() - entrada["actualizado"] > self.ttl:
+            return entrada["products"], "stale"
+        return entrada["products"], "hit"
+
+    def guardar(self, tienda, products):
+        # Un scrape vacío casi siempre es un error de la página; no pisa el catálogo anterior
+        if not products:
+            return
+        with self._lock:
+            self._entradas[tienda] = {"products": products, "actualizado": time.time()}
+            self._persistir()
+        for callback in self._suscriptores:
+            try:
+                callback(tienda, products)
+            except Exception as e:
+                print(f"Error al notificar la actualización de {tienda}: {e}")
+
+    def estado(self):
+        ahora = time.time()
+        return {
+            tienda: {
+                "productos": len(entrada["products"]),
+                "edad_segundos": int(ahora - entrada["actualizado"]),
+                "vencido": ahora - entrada["actualizado"] > self.ttl,
+            }
+            for tienda, entrada in self._entradas.items()
+        }
+
+    def _cargar_tienda(self, tienda, loader):
+        products = loader()
+        self.guardar(tienda, products)
+        return products
+
+    def _refrescar_en_segundo_plano(self, tienda, loader):
+        with self._lock:
+            if tienda in self._refrescando:
+                return
+            self._refrescando.add(tienda)
+
+        def refrescar():
+            try:
+                self._cargar_tienda(tienda, loader)
+            except Exception as e:
+                print(f"Error al refrescar la cache de {tienda}: {e}")
+            finally:
+                with self._lock:
+                    self._refrescando.discard(tienda)
+
+        threading.Thread(target=refrescar, daemon=True).start()
+
+    def _cargar(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entradas = json.load(f)
+            print(f"Cache de precios cargada desde {self.path} ({len(self._entradas)} tiendas)")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer la cache de precios, se empieza vacía: {e}")
+
+    def _persistir(self):
+        # Escritura atómica: un corte a mitad de escritura no deja el archivo corrupto
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporal = self.path + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self._entradas, f, ensure_ascii=False)
+            os.replace(temporal, self.path)
+        except OSError as e:
+            print(f"Error al guardar la cache de precios: {e}")
@@ -0,0 +1,194 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from catalogo import version_de
+from frontera import Frontera
+
+# Variación aleatoria del intervalo (fracción) para que las tiendas no coincidan
+CALENTADOR_JITTER = float(os.getenv("CALENTADOR_JITTER", "0.1"))
+# Separación (segundos) entre las tiendas que hay que refrescar apenas arranca el proceso
+CALENTADOR_ESCALON = float(os.getenv("CALENTADOR_ESCALON", "5"))
+# Backoff de las tiendas que fallan: BASE, 2*BASE, 4*BASE... hasta MAX
+CALENTADOR_BACKOFF_BASE = float(os.getenv("CALENTADOR_BACKOFF_BASE", "60"))
+CALENTADOR_BACKOFF_MAX = float(os.getenv("CALENTADOR_BACKOFF_MAX", "3600"))
+# Peso del último refresco en la tasa de cambio de precios (promedio exponencial) que da la prioridad
+CALENTADOR_ALFA_CAMBIOS = float(os.getenv("CALENTADOR_ALFA_CAMBIOS", "0.3"))
+
+
+def _iso(instante):
+    return datetime.fromtimestamp(instante).isoformat(timespec="seconds") if instante else None
+
+
+class _EstadoTienda:
+    def __init__(self):
+        self.ultimo_refresco = None
+        self.duracion = None
+        self.productos = None
+        self.fallos_seguidos = 0
+        self.ultimo_error = None
+        self.version = None
+        self.tasa_cambios = 0.0
+
+
+class Calentador:
+    """
+    Refresca el catálogo de cada tienda en segundo plano, cada `tienda.intervalo` segundos
+    (con jitter), para que los pedidos siempre encuentren la cache lista.
+
+    `refrescar(tienda)` scrapea y guarda; devuelve los productos. Una lista vacía o una
+    excepción cuentan como fallo y la tienda se reintenta con backoff exponencial.
+
+    El calentador decide cuándo le toca a cada tienda; la frontera (frontera.py) decide cuál corre
+    primero entre las vencidas, respetando workers y dominios. Las tiendas cuyos precios cambian
+    seguido van adelante: prioridad = `tienda.prioridad` + tasa de refrescos que trajeron cambios.
+    """
+
+    def __init__(self, tiendas, refrescar, frontera=None, jitter=CALENTADOR_JITTER,
+                 escalon=CALENTADOR_ESCALON, backoff_base=CALENTADOR_BACKOFF_BASE,
+                 backoff_max=CALENTADOR_BACKOFF_MAX, alfa_cambios=CALENTADOR_ALFA_CAMBIOS):
+        self.tiendas = {tienda.id: tienda for tienda in tiendas}
+        self.refrescar = refrescar
+        self.frontera = frontera or Frontera(self._correr)
+        self.jitter = jitter
+        self.escalon = escalon
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.alfa_cambios = alfa_cambios
+        self._estados = {tienda_id: _EstadoTienda() for tienda_id in self.tiendas}
+        self._lock = threading.Lock()
+        self._detenido = False
+        # Vuelta: cada tienda del registro refrescada (o fallida) una vez; al cerrarse se avisa
+        self._faltan_en_vuelta = set(self.tiendas)
+        self._al_terminar_vuelta = []
+
+    def al_terminar_vuelta(self, callback):
+        """Registra callback(), que se llama cuando todas las tiendas terminaron (bien o mal) su refresco."""
+        self._al_terminar_vuelta.append(callback)
+
+    def iniciar(self, edades=None):
+        """
+        Arranca la frontera. Las tiendas que ya estaban en la frontera guardada conservan su turno;
+        para las demás, `edades` (id -> segundos desde el último scrape) evita rehacer al arrancar
+        lo que la cache en disco ya tiene fresco. Lo vencido o ausente se agenda enseguida,
+        escalonado para no abrir todas las tiendas a la vez. Las tareas guardadas de tiendas que
+        ya no están en el registro se descartan.
+        """
+        edades = edades or {}
+        ahora = time.time()
+        escalon = 0
+        self._detenido = False
+        for clave in self.frontera.claves() - set(self.tiendas):
+            print(f"Frontera: se descarta la tarea guardada de {clave}, que ya no está en el registro")
+            self.frontera.quitar(clave)
+        for tienda_id, tienda in self.tiendas.items():
+            guardada = self.frontera.tarea(tienda_id)
+            if guardada:
+                estado = self._estados[tienda_id]
+                estado.version = guardada["datos"].get("version")
+                estado.tasa_cambios = guardada["datos"].get("tasa_cambios", 0.0)
+                estado.fallos_seguidos = guardada["datos"].get("fallos_seguidos", 0)
+                self._agendar(tienda_id, guardada["instante"])
+                continue
+            restante = tienda.intervalo - edades.get(tienda_id, tienda.intervalo)
+            if restante <= 0:
+                espera = escalon * self.escalon
+                escalon += 1
+            else:
+                espera = self._con_jitter(restante)
+            self._agendar(tienda_id, ahora + espera)
+        self.frontera.iniciar()
+
+    def adelantar(self, tienda_id):
+        """Agenda un refresco inmediato de la tienda (si no hay uno en curso)."""
+        if not self.frontera.en_curso(tienda_id):
+            self._agendar(tienda_id, time.time())
+
+    def detener(self):
+        self._detenido = True
+        self.frontera.detener()
+
+    def activo(self):
+        return self.frontera.activa()
+
+    def estado(self):
+        with self._lock:
+            estados = {
+                tienda_id: {
+                    "ultimo_refresco": _iso(estado.ultimo_refresco),
+                    "duracion_segundos": round(estado.duracion, 2) if estado.duracion is not None else None,
+                    "productos": estado.productos,
+                    "fallos_seguidos": estado.fallos_seguidos,
+                    "ultimo_error": estado.ultimo_error,
+                    "tasa_cambios": round(estado.tasa_cambios, 3),
+                }
+                for tienda_id, estado in self._estados.items()
+            }
+        for tienda_id, estado in estados.items():
+            tarea = self.frontera.tarea(tienda_id)
+            en_curso = self.frontera.en_curso(tienda_id)
+            estado["en_curso"] = en_curso
+            estado["proximo_refresco"] = _iso(tarea["instante"]) if tarea and not en_curso else None
+        return estados
+
+    def _agendar(self, tienda_id, instante):
+        tienda = self.tiendas[tienda_id]
+        with self._lock:
+            estado = self._estados[tienda_id]
+            datos = {
+                "version": estado.version,
+                "tasa_cambios": estado.tasa_cambios,
+                "fallos_seguidos": estado.fallos_seguidos,
+            }
+            prioridad = tienda.prioridad + estado.tasa_cambios
+        self.frontera.agendar(tienda_id, instante, tienda.dominio, prioridad, datos)
+
+    def _correr(self, tienda_id):
+        tienda = self.tiendas[tienda_id]
+        inicio = time.monotonic()
+        products, error = None, None
+        try:
+            products = self.refrescar(tienda)
+            if not products:
+                error = "sin productos"
+        except Exception as e:
+            error = str(e)
+        duracion = time.monotonic() - inicio
+
+        with self._lock:
+            estado = self._estados[tienda_id]
+            estado.duracion = duracion
+            if error is None:
+                version = version_de(products)
+                if estado.version is not None:
+                    cambio = 1.0 if version != estado.version else 0.0
+                    estado.tasa_cambios += self.alfa_cambios * (cambio - estado.tasa_cambios)
+                estado.version = version
+                estado.ultimo_refresco = time.time()
+                estado.productos = len(products)
+                estado.fallos_seguidos = 0
+                estado.ultimo_error = None
+                espera = self._con_jitter(tienda.intervalo)
+            else:
+                estado.fallos_seguidos += 1
+                estado.ultimo_error = error
+                espera = min(self.backoff_base * 2 ** (estado.fallos_seguidos - 1), self.backoff_max)
+                espera = self._con_jitter(min(espera, tienda.intervalo))
+                print(f"Error al refrescar {tienda_id} en segundo plano ({error}); reintento en {espera:.0f}s")
+            self._faltan_en_vuelta.discard(tienda_id)
+            vuelta_terminada = not self._faltan_en_vuelta
+            if vuelta_terminada:
+                self._faltan_en_vuelta = set(self.tiendas)
+        if not self._detenido:
+            self._agendar(tienda_id, time.time() + espera)
+        if vuelta_terminada:
+            for callback in self._al_terminar_vuelta:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error al cerrar la vuelta del calentador: {e}")
+
+    def _con_jitter(self, segundos):
+        return segundos * random.uniform(1 - self.jitter, 1 + self.jitter)
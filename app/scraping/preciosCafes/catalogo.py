@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from indicePrecios import IndicePrecios
+from productos import id_producto
+
+# Versiones anteriores del catálogo que se recuerdan para responder /productos/cambios
+CATALOGO_VERSIONES = int(os.getenv("CATALOGO_VERSIONES", "50"))
+
+
+def id_publico(url):
+    """ID estable de un producto para la API, en hexadecimal (un entero de 64 bits no entra en un número de JS)."""
+    return format(id_producto(url), "016x")
+
+
+def version_de(products):
+    """
+    Versión de contenido de una lista de productos: cambia si cambia algún nombre, precio o URL,
+    o el precio por kilo (un peso recién leído de la página del producto también cambia los rankings).
+    """
+    firma = hashlib.sha1()
+    for product in sorted(products, key=lambda p: p["url"]):
+        firma.update(
+            f"{product['url']}\x1f{product['name']}\x1f{product['price']}\x1f{product.get('price_per_kg')}\x1e"
+            .encode("utf-8")
+        )
+    return firma.hexdigest()[:16]
+
+
+class Catalogo:
+    """
+    Catálogo combinado con versión de contenido. Recuerda las últimas versiones para que
+    los clientes pidan sólo lo que cambió desde la que ya tienen.
+    """
+
+    def __init__(self, max_versiones=CATALOGO_VERSIONES):
+        self.max_versiones = max_versiones
+        self.version = None
+        self.products = []
+        self._versiones = OrderedDict()
+        self._lock = threading.Lock()
+
+    def actualizar(self, products, version=None):
+        """
+        Registra el catálogo actual (lista de productos con 'id' estable) y devuelve su versión.
+        Si el contenido no cambió, la versión es la misma y no se guarda nada nuevo.
+        `version` evita recalcularla si ya se conoce (ver VistaCatalogo).
+        """
+        version = version or version_de(products)
+        with self._lock:
+            if version != self.version:
+                self.version = version
+                self.products = products
+                self._versiones[version] = {product["id"]: product for product in products}
+                while len(self._versiones) > self.max_versiones:
+                    self._versiones.popitem(last=False)
+            else:
+                self._versiones.move_to_end(version)
+        return version
+
+    def cambios(self, desde, hasta=None):
+        """
+        Diferencias entre la versión `desde` y `hasta` (por defecto la actual): agregados, quitados
+        y con precio nuevo. Devuelve None si alguna es desconocida (muy vieja o de otro proceso).
+        """
+        with self._lock:
+            anterior = self._versiones.get(desde)
+            actual = self._versiones.get(hasta or self.version)
+        if anterior is None or actual is None:
+            return None
+
+        added = [product for product_id, product in actual.items() if product_id not in anterior]
+        removed = [product_id for product_id in anterior if product_id not in actual]
+        repriced = [
+            {**product, "old_price": anterior[product_id]["price"]}
+            for product_id, product in actual.items()
+            if product_id in anterior and anterior[product_id]["price"] != product["price"]
+        ]
+        return {"added": added, "removed": removed, "repriced": repriced}
+
+
+class Vista:
+    """Foto inmutable del catálogo combinado: productos con 'id', versión e índices ya ordenados."""
+
+    def __init__(self, products, version, indices, tiendas):
+        self.products = products
+        self.version = version
+        self.indices = indices
+        self.tiendas = tiendas
+
+
+class VistaCatalogo:
+    """
+    Catálogo combinado precalculado. Se suscribe a la cache de precios y en cada escritura de una
+    tienda rearma la foto: copia con 'id' sólo de esa tienda, versión combinada a partir de las
+    versiones por tienda y un IndicePrecios por clave. Los pedidos sólo leen `actual()`.
+
+    Cada foto se registra en `catalogo`, así la versión que recibe un cliente sirve para pedir
+    /productos/cambios. Una tienda que falla no sale de la foto: la cache sigue teniendo su último
+    catálogo, y una que todavía no tiene ninguno (o lo tiene vacío) no figura hasta que lo tenga.
+    """
+
+    def __init__(self, orden, catalogo, claves=("price",)):
+        self.orden = list(orden)
+        self.catalogo = catalogo
+        self.claves = claves
+        self._por_tienda = {}
+        self._versiones = {}
+        self._vista = Vista([], version_de([]), {clave: IndicePrecios([], clave) for clave in claves}, set())
+        self._lock = threading.Lock()
+
+    def actualizar_tienda(self, tienda, products):
+        version_tienda = version_de(products)
+        con_id = [{**product, "id": id_publico(product["url"])} for product in products]
+        with self._lock:
+            self._por_tienda[tienda] = con_id
+            # Se guarda también la lista de la cache, para reconocerla en version_tienda()
+            self._versiones[tienda] = (products, version_tienda)
+            tiendas = [tienda_id for tienda_id in self.orden if tienda_id in self._por_tienda]
+            combinado = [product for tienda_id in tiendas for product in self._por_tienda[tienda_id]]
+            firma = "\x1e".join(f"{tienda_id}\x1f{self._versiones[tienda_id][1]}" for tienda_id in tiendas)
+            version = hashlib.sha1(firma.encode("utf-8")).hexdigest()[:16]
+            self.catalogo.actualizar(combinado, version)
+            indices = {clave: IndicePrecios(combinado, clave) for clave in self.claves}
+            self._vista = Vista(combinado, version, indices, set(tiendas))
+
+    def actual(self):
+        return self._vista
+
+    def version_tienda(self, tienda, products):
+        """Versión del catálogo de una tienda; sin recalcular si es la lista que está en la cache."""
+        guardada = self._versiones.get(tienda)
+        if guardada and guardada[0] is products:
+            return guardada[1]
+        return version_de(products)
@@ -0,0 +1,135 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Fallos seguidos que abren el circuito de una tienda y segundos que queda abierto
+CIRCUITO_FALLOS = int(os.getenv("CIRCUITO_FALLOS", "3"))
+CIRCUITO_ENFRIAMIENTO = float(os.getenv("CIRCUITO_ENFRIAMIENTO", "300"))
+# Timeout adaptativo: p95 de los últimos scrapes exitosos por un margen, entre un mínimo y el timeout de la tienda
+CIRCUITO_MUESTRAS = int(os.getenv("CIRCUITO_MUESTRAS", "50"))
+CIRCUITO_MUESTRAS_MINIMAS = int(os.getenv("CIRCUITO_MUESTRAS_MINIMAS", "5"))
+CIRCUITO_MARGEN_P95 = float(os.getenv("CIRCUITO_MARGEN_P95", "1.5"))
+CIRCUITO_TIMEOUT_MINIMO = float(os.getenv("CIRCUITO_TIMEOUT_MINIMO", "5"))
+
+CERRADO = "cerrado"
+ABIERTO = "abierto"
+SEMIABIERTO = "semiabierto"
+
+
+class CircuitoAbierto(Exception):
+    """La tienda falló varias veces seguidas; no se intenta hasta que pase el enfriamiento."""
+
+    def __init__(self, mensaje, reintento_en):
+        super().__init__(mensaje)
+        self.reintento_en = reintento_en
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por rango más cercano."""
+    ordenados = sorted(valores)
+    return ordenados[max(math.ceil(p / 100 * len(ordenados)) - 1, 0)]
+
+
+class Circuito:
+    """
+    Circuit breaker de una tienda.
+
+    - cerrado: se scrapea normalmente; `fallos` errores seguidos lo abren.
+    - abierto: no se scrapea durante `enfriamiento` segundos.
+    - semiabierto: pasado el enfriamiento se deja pasar un solo intento de prueba;
+      si sale bien se cierra y si falla vuelve a abrirse.
+    """
+
+    def __init__(self, tienda_id, timeout_base, fallos=CIRCUITO_FALLOS, enfriamiento=CIRCUITO_ENFRIAMIENTO,
+                 muestras=CIRCUITO_MUESTRAS):
+        self.tienda_id = tienda_id
+        self.timeout_base = timeout_base
+        self.fallos = fallos
+        self.enfriamiento = enfriamiento
+        self._latencias = deque(maxlen=muestras)
+        self._estado = CERRADO
+        self._fallos_seguidos = 0
+        self._abierto_desde = None
+        self._prueba_en_curso = False
+        self._ultimo_error = None
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        """Levanta CircuitoAbierto si la tienda no se debe intentar ahora."""
+        with self._lock:
+            if self._estado == CERRADO:
+                return
+            restante = self._abierto_desde + self.enfriamiento - time.monotonic()
+            if self._estado == ABIERTO and restante <= 0:
+                self._estado = SEMIABIERTO
+            if self._estado == SEMIABIERTO and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return
+        raise CircuitoAbierto(f"Circuito abierto para {self.tienda_id}: {self._ultimo_error}", max(restante, 0))
+
+    def exito(self, duracion):
+        with self._lock:
+            self._latencias.append(duracion)
+            self._fallos_seguidos = 0
+            self._estado = CERRADO
+            self._prueba_en_curso = False
+            self._ultimo_error = None
+
+    def descartar(self):
+        """El intento no llegó a probar la tienda (ej. no había navegador libre): no cuenta ni a favor ni en contra."""
+        with self._lock:
+            self._prueba_en_curso = False
+
+    def fallo(self, error):
+        with self._lock:
+            self._fallos_seguidos += 1
+            self._ultimo_error = str(error)
+            self._prueba_en_curso = False
+            if self._estado == SEMIABIERTO or self._fallos_seguidos >= self.fallos:
+                if self._estado != ABIERTO:
+                    print(f"Circuito abierto para {self.tienda_id} por {self.enfriamiento:.0f}s: {error}")
+                self._estado = ABIERTO
+                self._abierto_desde = time.monotonic()
+
+    def timeout(self):
+        """Timeout actual de la tienda: p95 observado con margen, acotado por el timeout configurado."""
+        with self._lock:
+            if len(self._latencias) < CIRCUITO_MUESTRAS_MINIMAS:
+                return self.timeout_base
+            p95 = percentil(self._latencias, 95)
+        return min(max(p95 * CIRCUITO_MARGEN_P95, CIRCUITO_TIMEOUT_MINIMO), self.timeout_base)
+
+    def estado(self):
+        with self._lock:
+            latencias = list(self._latencias)
+            estado = {
+                "estado": self._estado,
+                "fallos_seguidos": self._fallos_seguidos,
+                "ultimo_error": self._ultimo_error,
+                "abierto_desde": None,
+                "reintento_en_segundos": None,
+            }
+            if self._estado != CERRADO:
+                transcurrido = time.monotonic() - self._abierto_desde
+                estado["abierto_desde"] = datetime.fromtimestamp(time.time() - transcurrido).isoformat(timespec="seconds")
+                estado["reintento_en_segundos"] = max(round(self.enfriamiento - transcurrido), 0)
+        estado["muestras"] = len(latencias)
+        estado["p95_segundos"] = round(percentil(latencias, 95), 2) if latencias else None
+        estado["timeout_segundos"] = round(self.timeout(), 2)
+        return estado
+
+
+class Circuitos:
+    """Un circuito por tienda del registro."""
+
+    def __init__(self, tiendas):
+        self._circuitos = {tienda.id: Circuito(tienda.id, tienda.timeout) for tienda in tiendas}
+
+    def __getitem__(self, tienda_id):
+        return self._circuitos[tienda_id]
+
+    def estado(self):
+        return {tienda_id: circuito.estado() for tienda_id, circuito in self._circuitos.items()}
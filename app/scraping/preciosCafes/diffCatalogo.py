@@ -0,0 +1,67 @@
+import os
+import queue
+import threading
+
+from metricas import EVENTOS_CATALOGO
+
+# Diferencias entre el catálogo anterior y el nuevo de cada tienda, como eventos para el notificador
+
+# Cambios de precio menores a este porcentaje no generan evento (redondeos, centavos)
+DIFF_CAMBIO_MINIMO = float(os.getenv("DIFF_CAMBIO_MINIMO", "3"))
+
+NUEVO = "nuevo"
+QUITADO = "quitado"
+BAJA = "baja"
+SUBA = "suba"
+
+
+def _evento(tipo, tienda, product, old_price=None):
+    evento = {"tipo": tipo, "tienda": tienda, "name": product["name"], "url": product["url"], "price": product["price"]}
+    if old_price is not None:
+        evento["old_price"] = old_price
+        evento["porcentaje"] = round((product["price"] - old_price) * 100 / old_price, 1)
+    return evento
+
+
+def diferencias(tienda, anterior, actual, cambio_minimo=DIFF_CAMBIO_MINIMO):
+    """
+    Eventos entre dos snapshots de una tienda. Hash join por URL: un diccionario del anterior
+    y una pasada por el actual, O(n) en vez de comparar cada producto contra todos.
+    """
+    previos = {product["url"]: product for product in anterior}
+    eventos = []
+    for product in actual:
+        previo = previos.pop(product["url"], None)
+        if previo is None:
+            eventos.append(_evento(NUEVO, tienda, product))
+        elif previo["price"] != product["price"] and previo["price"]:
+            variacion = abs(product["price"] - previo["price"]) * 100 / previo["price"]
+            if variacion >= cambio_minimo:
+                tipo = BAJA if product["price"] < previo["price"] else SUBA
+                eventos.append(_evento(tipo, tienda, product, previo["price"]))
+    # Lo que quedó en el diccionario no apareció en el catálogo nuevo
+    eventos.extend(_evento(QUITADO, tienda, product) for product in previos.values())
+    return eventos
+
+
+class DiffCatalogo:
+    """
+    Se suscribe a la cache de precios: cada vez que se guarda el catálogo de una tienda lo compara
+    con el anterior y encola los eventos en `cola`. La primera vez que ve una tienda (ej. lo que la
+    cache leyó de disco al arrancar) sólo lo toma como referencia.
+    """
+
+    def __init__(self, cola=None):
+        self.cola = cola or queue.Queue()
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def actualizar_tienda(self, tienda, products):
+        with self._lock:
+            anterior = self._snapshots.get(tienda)
+            self._snapshots[tienda] = products
+        if anterior is None or anterior is products:
+            return
+        for evento in diferencias(tienda, anterior, products):
+            EVENTOS_CATALOGO.inc(tipo=evento["tipo"])
+            self.cola.put(evento)
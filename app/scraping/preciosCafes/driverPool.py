@@ -0,0 +1,213 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Configuración del pool (se puede ajustar desde el entorno del contenedor)
+POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "6"))  # uno por tienda en /productosCombinados
+POOL_MAX_USOS = int(os.getenv("DRIVER_POOL_MAX_USOS", "50"))
+POOL_MAX_RSS_MB = int(os.getenv("DRIVER_POOL_MAX_RSS_MB", "700"))
+POOL_ESPERA = float(os.getenv("DRIVER_POOL_ESPERA", "60"))
+
+
+class PoolAgotado(Exception):
+    """No hubo un driver libre dentro del tiempo de espera."""
+
+
+def rss_proceso_mb(pid):
+    """
+    Suma la memoria residente (VmRSS) de un proceso y todos sus descendientes.
+    Chrome abre varios procesos hijos debajo de chromedriver, por eso se recorre el árbol.
+    Devuelve 0 si /proc no está disponible.
+    """
+    if not pid or not os.path.isdir("/proc"):
+        return 0
+
+    hijos = {}
+    rss = {}
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/status") as f:
+                ppid, kb = None, 0
+                for linea in f:
+                    if linea.startswith("PPid:"):
+                        ppid = int(linea.split()[1])
+                    elif linea.startswith("VmRSS:"):
+                        kb = int(linea.split()[1])
+        except (OSError, ValueError):
+            continue
+        rss[int(entrada)] = kb
+        hijos.setdefault(ppid, []).append(int(entrada))
+
+    total_kb = 0
+    pendientes = [pid]
+    while pendientes:
+        actual = pendientes.pop()
+        total_kb += rss.get(actual, 0)
+        pendientes.extend(hijos.get(actual, []))
+    return total_kb // 1024
+
+
+class _DriverEnPool:
+    def __init__(self, driver):
+        self.driver = driver
+        self.usos = 0
+        self.creado = time.time()
+
+    def pid(self):
+        try:
+            return self.driver.service.process.pid
+        except AttributeError:
+            return None
+
+
+class DriverPool:
+    """
+    Pool acotado de navegadores Chrome ya iniciados.
+    Las rutas toman un driver con `with pool.driver() as driver:` y lo devuelven al terminar,
+    así no se paga el arranque de Chrome en cada request.
+    """
+
+    def __init__(self, factory, size=POOL_SIZE, max_usos=POOL_MAX_USOS,
+                 max_rss_mb=POOL_MAX_RSS_MB, espera=POOL_ESPERA, admision=None):
+        self._factory = factory
+        # Control de admisión opcional (admision.ControlAdmision): acota sesiones y cola de espera
+        self._admision = admision
+        self.size = size
+        self.max_usos = max_usos
+        self.max_rss_mb = max_rss_mb
+        self.espera = espera
+
+        # LIFO: se reutiliza primero el driver más "caliente"
+        self._libres = queue.LifoQueue()
+        self._creados = 0
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Lanza los drivers por adelantado para que el primer request no espere."""
+        while True:
+            with self._lock:
+                if self._creados >= self.size:
+                    return
+                self._creados += 1
+            try:
+                self._libres.put(_DriverEnPool(self._factory()))
+            except Exception as e:
+                with self._lock:
+                    self._creados -= 1
+                print(f"Error al precalentar el pool de drivers: {e}")
+                return
+
+    @contextmanager
+    def driver(self):
+        with self._admision.admitir() if self._admision else nullcontext():
+            entrada = self._tomar()
+            ok = False
+            try:
+                yield entrada.driver
+                ok = True
+            finally:
+                self._devolver(entrada, ok)
+
+    def estado(self):
+        return {
+            "size": self.size,
+            "creados": self._creados,
+            "libres": self._libres.qsize(),
+        }
+
+    def cerrar(self):
+        while True:
+            try:
+                entrada = self._libres.get_nowait()
+            except queue.Empty:
+                return
+            self._descartar(entrada)
+
+    def _tomar(self):
+        limite = time.monotonic() + self.espera
+        while True:
+            try:
+                entrada = self._libres.get_nowait()
+            except queue.Empty:
+                entrada = self._crear_o_esperar(limite)
+
+            if self._sano(entrada):
+                entrada.usos += 1
+                return entrada
+            # Driver colgado o caído: se descarta y se intenta con otro
+            self._descartar(entrada)
+
+    def _crear_o_esperar(self, limite):
+        with self._lock:
+            puede_crear = self._creados < self.size
+            if puede_crear:
+                self._creados += 1
+        if puede_crear:
+            try:
+                return _DriverEnPool(self._factory())
+            except Exception:
+                with self._lock:
+                    self._creados -= 1
+                raise
+
+        restante = limite - time.monotonic()
+        try:
+            return self._libres.get(timeout=max(restante, 0))
+        except queue.Empty:
+            raise PoolAgotado(f"No hay drivers libres después de {self.espera}s")
+
+    def _sano(self, entrada):
+        try:
+            entrada.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _devolver(self, entrada, ok):
+        if not ok or not self._resetear(entrada) or self._debe_reciclarse(entrada):
+            self._descartar(entrada)
+            # Se repone el driver en segundo plano para mantener el pool caliente
+            threading.Thread(target=self.iniciar, daemon=True).start()
+            return
+        self._libres.put(entrada)
+
+    def _resetear(self, entrada):
+        """Deja el navegador limpio para el próximo uso: sin cookies, storage ni pestañas extra."""
+        driver = entrada.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass  # about:blank y algunas páginas no permiten acceder al storage
+            driver.delete_all_cookies()
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"Error al resetear el driver, se descarta: {e}")
+            return False
+
+    def _debe_reciclarse(self, entrada):
+        if entrada.usos >= self.max_usos:
+            return True
+        return rss_proceso_mb(entrada.pid()) >= self.max_rss_mb
+
+    def _descartar(self, entrada):
+        try:
+            entrada.driver.quit()
+        except Exception as e:
+            print(f"Error al cerrar el driver: {e}")
+        finally:
+            with self._lock:
+                self._creados -= 1
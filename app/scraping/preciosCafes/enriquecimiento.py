@@ -0,0 +1,282 @@
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+import soupsieve
+
+from busqueda import plegar
+from cachePrecios import CACHE_DIR
+from metricas import DETALLES
+from motorHtml import HTTP_TIMEOUT, descargar_condicional, parsear
+from paginacion import executor_paginas, semaforo_dominio
+
+# Enriquecimiento: los listados sólo dan nombre, precio y URL. La página de cada producto dice
+# peso, origen, proceso y tueste; se baja una vez, se guarda por URL y después sólo se revalida.
+# Cada producto sale con weight_g, origin, process y roast (None si no se pudo leer).
+# Las páginas se piden en los refrescos del calentador; sin calentador sólo se usa lo ya guardado.
+
+ENRIQUECIMIENTO_ACTIVO = os.getenv("ENRIQUECIMIENTO_ACTIVO", "1") != "0"
+ENRIQUECIMIENTO_PATH = os.getenv("ENRIQUECIMIENTO_PATH", os.path.join(CACHE_DIR, "detalles.json"))
+# Segundos en que lo guardado de una página se usa sin preguntar; después se revalida con un GET condicional
+ENRIQUECIMIENTO_VIGENCIA = float(os.getenv("ENRIQUECIMIENTO_VIGENCIA", "86400"))
+# Páginas que se piden por tienda y por ciclo; lo que no entra queda para el ciclo siguiente
+ENRIQUECIMIENTO_POR_CICLO = int(os.getenv("ENRIQUECIMIENTO_POR_CICLO", "40"))
+
+ATRIBUTOS = ("weight_g", "origin", "process", "roast")
+
+# Donde los temas de WooCommerce y Tiendanube ponen la descripción y la ficha del producto
+DESCRIPCION = (
+    '[itemprop="description"], .woocommerce-product-details__short-description, '
+    ".woocommerce-Tabs-panel--description, .woocommerce-product-attributes, .product_meta, "
+    ".product-description, .js-product-description, .product-details, .description"
+)
+
+ORIGENES = {
+    "colombia": "Colombia", "brasil": "Brasil", "brazil": "Brasil", "etiopia": "Etiopía",
+    "ethiopia": "Etiopía", "kenia": "Kenia", "kenya": "Kenia", "guatemala": "Guatemala",
+    "honduras": "Honduras", "peru": "Perú", "nicaragua": "Nicaragua", "costa rica": "Costa Rica",
+    "el salvador": "El Salvador", "mexico": "México", "ruanda": "Ruanda", "rwanda": "Ruanda",
+    "burundi": "Burundi", "bolivia": "Bolivia", "ecuador": "Ecuador", "panama": "Panamá",
+    "indonesia": "Indonesia", "sumatra": "Indonesia", "india": "India", "tanzania": "Tanzania",
+    "uganda": "Uganda", "yemen": "Yemen", "papua": "Papúa Nueva Guinea", "congo": "Congo",
+}
+# "semi lavado" antes que "lavado": gana la primera coincidencia de la lista
+PROCESOS = (
+    ("semi lavado", "semilavado"), ("semilavado", "semilavado"), ("honey", "honey"), ("miel", "honey"),
+    ("anaerobico", "anaeróbico"), ("anaerobic", "anaeróbico"), ("lavado", "lavado"), ("washed", "lavado"),
+    ("natural", "natural"),
+)
+TUESTES = (
+    ("medio claro", "medio-claro"), ("medio oscuro", "medio-oscuro"), ("claro", "claro"), ("light", "claro"),
+    ("medio", "medio"), ("medium", "medio"), ("oscuro", "oscuro"), ("dark", "oscuro"), ("intenso", "oscuro"),
+)
+
+# Cantidad y unidad ("250 grs", "1,5kg", "1/2 kilo"), con las unidades de un pack delante ("Pack 2x250g"),
+# o una fracción suelta, que en los cafés es de kilo ("Etiopía 1/4")
+PATRON_PESO = re.compile(
+    r"(?:(?<![\d.,/])(\d+)\s*[x×]\s*)?(\d+/\d+|\d+(?:[.,]\d+)?)\s*(kg|kilos?|grs?|gramos|g)\b"
+    r"|\b(1/4|1/2|3/4)(?![\d/])", re.IGNORECASE)
+_ROTULO_ORIGEN = re.compile(r"\b(?:origen|origin|pais|region|finca)\s+((?:[a-z]+\s?){1,4})")
+_ROTULO_PROCESO = re.compile(r"\b(?:proceso|process|beneficio)\s+((?:[a-z]+\s?){1,3})")
+_ROTULO_TUESTE = re.compile(r"\b(?:tueste|tostado|tostion|roast)\s+(?:nivel\s+)?((?:[a-z]+\s?){1,2})")
+_ROTULO_TUESTE_INGLES = re.compile(r"\b(light|medium|dark)\s+roast\b")
+_CSS_DESCRIPCION = soupsieve.compile(DESCRIPCION)
+
+
+def cantidad(texto):
+    """ "1,5" -> 1.5, "1/4" -> 0.25."""
+    if "/" in texto:
+        numerador, denominador = texto.split("/")
+        return int(numerador) / int(denominador) if int(denominador) else 0
+    return float(texto.replace(",", "."))
+
+
+def gramos(texto):
+    """
+    Primer peso del texto en gramos: "Café 1,5 kg" -> 1500, "250grs" -> 250, "Blend 1/4" -> 250.
+    Un pack es el peso total: "Pack 2x250g" -> 500.
+    """
+    coincidencia = PATRON_PESO.search(texto or "")
+    if not coincidencia:
+        return None
+    unidades, numero, unidad, fraccion = coincidencia.groups()
+    if fraccion:
+        numero, unidad = fraccion, "kg"
+    valor = cantidad(numero) * int(unidades or 1)
+    if unidad.lower().startswith("k"):
+        valor *= 1000
+    return int(round(valor)) or None
+
+
+def _vocabulario(texto, vocabulario):
+    for palabra, valor in vocabulario:
+        if re.search(rf"\b{palabra}\b", texto):
+            return valor
+    return None
+
+
+def _rotulado(texto, rotulo, vocabulario):
+    """Valor de un campo rotulado ("Proceso: Lavado") reconocido por el vocabulario."""
+    for coincidencia in rotulo.finditer(texto):
+        valor = _vocabulario(coincidencia.group(1), vocabulario)
+        if valor:
+            return valor
+    return None
+
+
+def _json_ld(soup):
+    """Descripción y peso del Product de schema.org que publican muchos temas."""
+    descripcion, peso = "", None
+    for script in soup.select('script[type="application/ld+json"]'):
+        try:
+            datos = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for item in datos if isinstance(datos, list) else datos.get("@graph", [datos]):
+            if isinstance(item, dict) and item.get("@type") == "Product":
+                descripcion += " " + str(item.get("description") or "")
+                peso = peso or item.get("weight")
+    if isinstance(peso, dict):
+        peso = f"{peso.get('value', '')} {peso.get('unitCode') or peso.get('unitText') or ''}"
+    return descripcion, peso
+
+
+def atributos_detalle(html, nombre="", css=None):
+    """
+    Peso, origen, proceso y tueste leídos de la página de un producto.
+    Se buscan primero en el nombre y en la descripción; los campos rotulados ("Origen: ...") también
+    en el resto de la página. Los nombres sueltos de países no, porque los menús los listan todos.
+    """
+    soup = parsear(html)
+    descripcion_ld, peso_ld = _json_ld(soup)
+    css = css or _CSS_DESCRIPCION
+    meta = soup.select_one('meta[name="description"]')
+    descripcion = " ".join(
+        [nodo.get_text(" ", strip=True) for nodo in css.select(soup)]
+        + [descripcion_ld, meta.get("content", "") if meta else ""]
+    )
+    cuerpo = soup.body.get_text(" ", strip=True) if soup.body else ""
+
+    texto = plegar(f"{nombre} {descripcion}")
+    pagina = plegar(cuerpo)
+    roast = _rotulado(texto, _ROTULO_TUESTE, TUESTES) or _rotulado(pagina, _ROTULO_TUESTE, TUESTES)
+    if roast is None:
+        ingles = _ROTULO_TUESTE_INGLES.search(texto)
+        roast = _vocabulario(ingles.group(1), TUESTES) if ingles else None
+    return {
+        "weight_g": gramos(nombre) or gramos(str(peso_ld or "")) or gramos(descripcion),
+        "origin": (_rotulado(texto, _ROTULO_ORIGEN, ORIGENES.items())
+                   or _rotulado(pagina, _ROTULO_ORIGEN, ORIGENES.items())
+                   or _vocabulario(texto, ORIGENES.items())),
+        # Sin rótulo, el proceso sólo sale del nombre ("Etiopía Natural"): un "natural" suelto no dice nada
+        "process": (_rotulado(texto, _ROTULO_PROCESO, PROCESOS) or _rotulado(pagina, _ROTULO_PROCESO, PROCESOS)
+                    or _vocabulario(plegar(nombre), PROCESOS)),
+        "roast": roast,
+    }
+
+
+def peso_listado(product):
+    """
+    Peso del precio que muestra el listado: el del nombre o el de la variante con ese precio.
+    Manda sobre el de la página, que suele listar todas las presentaciones.
+    """
+    peso = gramos(product["name"])
+    if peso:
+        return peso
+    for variante in product.get("variants") or []:
+        if variante.get("price") == product["price"]:
+            peso = gramos(" ".join(variante.get("attributes", [])))
+            if peso:
+                return peso
+    return None
+
+
+class Enriquecedor:
+    """
+    Agrega a los productos los atributos de su página, con una cache por URL en ENRIQUECIMIENTO_PATH.
+
+    Por ciclo, cada producto cae en uno de estos casos:
+    - vigente: revisado hace menos de ENRIQUECIMIENTO_VIGENCIA, no se pide nada.
+    - revalidación: GET condicional con el ETag / Last-Modified guardado; un 304 no baja ni parsea.
+    - nuevo o con otro nombre: se baja entero.
+    Las descargas comparten el executor y los límites por dominio de los listados (paginacion.py).
+    """
+
+    def __init__(self, path=ENRIQUECIMIENTO_PATH, vigencia=ENRIQUECIMIENTO_VIGENCIA,
+                 por_ciclo=ENRIQUECIMIENTO_POR_CICLO):
+        self.path = path
+        self.vigencia = vigencia
+        self.por_ciclo = por_ciclo
+        self._detalles = {}
+        self._lock = threading.Lock()
+        self._cargar()
+
+    def enriquecer(self, tienda, products, timeout=HTTP_TIMEOUT, revisar=True):
+        """
+        Copias de los productos con weight_g, origin, process y roast.
+        Con `revisar=False` sólo se usan los detalles guardados, sin pedir ninguna página.
+        """
+        ahora = time.time()
+        with self._lock:
+            guardados = {product["url"]: self._detalles.get(product["url"]) for product in products}
+
+        pendientes = []
+        for product in products if revisar else []:
+            detalle = guardados[product["url"]]
+            if detalle and detalle["nombre"] == product["name"] and ahora - detalle["revisado"] < self.vigencia:
+                DETALLES.inc(tienda=tienda.id, resultado="vigente")
+            elif len(pendientes) < self.por_ciclo:
+                pendientes.append(product)
+            else:
+                DETALLES.inc(tienda=tienda.id, resultado="pospuesto")
+
+        css = tienda.css_detalle
+
+        def revisar(product):
+            with semaforo_dominio(product["url"]):
+                return self._revisar(tienda, product, guardados[product["url"]], css, timeout)
+
+        for product, detalle in zip(pendientes, executor_paginas.map(revisar, pendientes)):
+            if detalle:
+                guardados[product["url"]] = detalle
+        if pendientes:
+            with self._lock:
+                self._detalles.update({url: detalle for url, detalle in guardados.items() if detalle})
+                self._persistir()
+
+        enriquecidos = []
+        for product in products:
+            detalle = guardados[product["url"]]
+            atributos = dict(detalle["atributos"]) if detalle else dict.fromkeys(ATRIBUTOS)
+            atributos["weight_g"] = peso_listado(product) or atributos["weight_g"]
+            enriquecidos.append({**product, **atributos})
+        return enriquecidos
+
+    def _revisar(self, tienda, product, detalle, css, timeout):
+        """Nuevo detalle de la URL, o None si hubo un error (se sigue usando el guardado, si hay)."""
+        mismo_nombre = detalle is not None and detalle["nombre"] == product["name"]
+        try:
+            html, headers = descargar_condicional(
+                product["url"],
+                detalle["etag"] if mismo_nombre else None,
+                detalle["last_modified"] if mismo_nombre else None,
+                timeout,
+            )
+        except requests.RequestException as e:
+            DETALLES.inc(tienda=tienda.id, resultado="error")
+            print(f"Error al bajar el detalle de {product['url']}: {e}")
+            return None
+        if html is None:
+            DETALLES.inc(tienda=tienda.id, resultado="no_modificado")
+            return {**detalle, "revisado": time.time()}
+        DETALLES.inc(tienda=tienda.id, resultado="descargado")
+        return {
+            "nombre": product["name"],
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "revisado": time.time(),
+            "atributos": atributos_detalle(html, product["name"], css),
+        }
+
+    def _cargar(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._detalles = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer la cache de detalles, se empieza vacía: {e}")
+
+    def _persistir(self):
+        # Escritura atómica, como la cache de precios
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporal = self.path + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self._detalles, f, ensure_ascii=False)
+            os.replace(temporal, self.path)
+        except OSError as e:
+            print(f"Error al guardar la cache de detalles: {e}")
@@ -0,0 +1,94 @@
+import os
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metricas import CARGA_PAGINA, EXTRACCION
+from productos import armar_productos
+
+# Segundos que se espera a que aparezcan los productos: con carga eager driver.get vuelve en
+# DOMContentLoaded y las grillas que arma el JS de la tienda todavía pueden estar vacías
+ESPERA_LISTADO = float(os.getenv("ESPERA_LISTADO", "10"))
+
+
+class PaginaIncompleta(Exception):
+    """Una página del listado no se pudo leer: el scrape falla entero en vez de devolver un catálogo a medias."""
+
+# Se ejecuta dentro del navegador y devuelve todas las filas [nombre, precio, url] de una vez.
+# Cada .text / get_attribute / find_element de Selenium es un round-trip HTTP a chromedriver;
+# con este script la página entera cuesta uno solo.
+SCRIPT_EXTRACCION = """
+const spec = arguments[0];
+const texto = el => (el.innerText || el.textContent || '').trim();
+const enlace = el => el.href || el.getAttribute('href') || '';
+const filas = [];
+
+if (spec.tarjeta) {
+    for (const tarjeta of document.querySelectorAll(spec.tarjeta)) {
+        const nombre = tarjeta.querySelector(spec.nombre);
+        const precio = tarjeta.querySelector(spec.precio);
+        const link = spec.enlace ? tarjeta.querySelector(spec.enlace) : tarjeta;
+        if (!nombre || !precio || !link) continue;
+        filas.push([texto(nombre), texto(precio), enlace(link)]);
+    }
+    return filas;
+}
+
+const nombres = document.querySelectorAll(spec.nombre);
+const precios = document.querySelectorAll(spec.precio);
+const links = document.querySelectorAll(spec.enlace);
+const total = Math.min(nombres.length, precios.length, links.length);
+for (let i = 0; i < total; i++) {
+    filas.push([texto(nombres[i]), texto(precios[i]), enlace(links[i])]);
+}
+return filas;
+"""
+
+SCRIPT_ENLACES = """
+return Array.from(document.querySelectorAll(arguments[0]), el => [(el.innerText || '').trim(), el.href || '']);
+"""
+
+
+def extraer_filas_dom(driver, spec):
+    """Extrae (nombre, precio, url) de la página cargada en un único execute_script."""
+    filas = driver.execute_script(SCRIPT_EXTRACCION, spec) or []
+    return [tuple(fila) for fila in filas]
+
+
+def extraer_enlaces_dom(driver, selector):
+    """Texto y href de los enlaces que coinciden con el selector (ej. la paginación), en un round-trip."""
+    return [tuple(enlace) for enlace in driver.execute_script(SCRIPT_ENLACES, selector) or []]
+
+
+def esperar_listado(driver, selectores, espera=ESPERA_LISTADO):
+    """Espera a que la página cargada tenga productos (la tarjeta o, sin tarjetas, el nombre)."""
+    selector = selectores.get("tarjeta") or selectores["nombre"]
+    try:
+        WebDriverWait(driver, espera).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+    except TimeoutException:
+        pass  # Un listado sin productos no es un error acá: lo decide quien lee las filas
+
+
+def buscar_selenium(driver, url, selectores, tienda="", armar=armar_productos, primera=True):
+    """
+    Carga un listado en el driver y devuelve los productos armados con `armar` (por defecto, normalizados).
+    Sólo la primera página de un listado puede no tener productos; un error al leerla, o una página
+    siguiente vacía, levanta PaginaIncompleta.
+    """
+    with CARGA_PAGINA.cronometrar(tienda=tienda, motor="selenium"):
+        driver.get(url)
+        esperar_listado(driver, selectores)
+    try:
+        with EXTRACCION.cronometrar(tienda=tienda, motor="selenium"):
+            filas = extraer_filas_dom(driver, selectores)
+    except Exception as e:
+        raise PaginaIncompleta(f"Error al extraer información de {url}: {e}") from e
+
+    if not filas:
+        if not primera:
+            raise PaginaIncompleta(f"No se encontraron productos en {url}, una página siguiente del listado")
+        print(f"No se encontraron productos en {url}.")
+        return []
+    return armar(filas)
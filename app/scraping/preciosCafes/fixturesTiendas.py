@@ -0,0 +1,252 @@
+"""
+Fixtures de las tiendas: grabar sus listados (y algunas páginas de producto) una vez y servirlos
+desde un servidor HTTP local, para medir y probar los extractores sin salir a la red.
+
+Uso:
+    python fixturesTiendas.py grabar [tienda ...]    # baja listados, paginación y productos
+    python fixturesTiendas.py servir [puerto]        # sirve lo grabado en http://127.0.0.1:<puerto>/
+
+Una URL grabada https://tienda.com/cafe/?mpage=2 se sirve en http://127.0.0.1:<puerto>/tienda.com/cafe/?mpage=2.
+Las tiendas con motor "selenium" se graban ya renderizadas (page_source después de cargar).
+Las respuestas de la Store API de WooCommerce se graban tal cual, con su Content-Type y los headers
+de paginación (X-WP-TotalPages), y se sirven igual.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import requests
+
+import motorHtml
+from motorHtml import descargar, extraer_enlaces, extraer_filas, parsear
+from paginacion import urls_restantes
+from productos import armar_productos, deduplicar
+from registroTiendas import REGISTRO, cargar_registro
+
+FIXTURES_DIR = os.getenv("FIXTURES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"))
+# Páginas de producto que se graban por tienda, además de los listados
+FIXTURES_PRODUCTOS = int(os.getenv("FIXTURES_PRODUCTOS", "3"))
+# Demora artificial (segundos) por respuesta del servidor local, para simular la red
+FIXTURES_LATENCIA = float(os.getenv("FIXTURES_LATENCIA", "0"))
+
+TIPO_HTML = "text/html; charset=utf-8"
+# Headers de las respuestas de API que los motores leen (paginación de la Store API)
+HEADERS_GRABADOS = ("X-WP-Total", "X-WP-TotalPages")
+
+
+def clave_fixture(url):
+    """Host, ruta y query: lo que identifica una página grabada."""
+    partes = urlparse(url)
+    return f"{partes.netloc}{partes.path or '/'}" + (f"?{partes.query}" if partes.query else "")
+
+
+def url_local(url, base):
+    """URL de la misma página en el servidor de fixtures."""
+    return f"{base.rstrip('/')}/{clave_fixture(url)}"
+
+
+class Fixtures:
+    """Páginas grabadas en FIXTURES_DIR, con un indice.json de URL -> archivo."""
+
+    def __init__(self, directorio=FIXTURES_DIR):
+        self.directorio = directorio
+        self.indice_path = os.path.join(directorio, "indice.json")
+        try:
+            with open(self.indice_path, "r", encoding="utf-8") as f:
+                self.indice = json.load(f)
+        except FileNotFoundError:
+            self.indice = {}
+        self._lock = threading.Lock()
+
+    def guardar(self, url, cuerpo, tipo=TIPO_HTML, headers=None):
+        clave = clave_fixture(url)
+        extension = ".json" if "json" in tipo else ".html"
+        archivo = hashlib.sha1(clave.encode("utf-8")).hexdigest()[:16] + extension
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(os.path.join(self.directorio, archivo), "w", encoding="utf-8") as f:
+            f.write(cuerpo)
+        entrada = {"url": url, "archivo": archivo, "grabado": datetime.now().isoformat(timespec="seconds")}
+        if tipo != TIPO_HTML:
+            entrada["tipo"] = tipo
+        if headers:
+            entrada["headers"] = headers
+        with self._lock:
+            self.indice[clave] = entrada
+
+    def leer(self, clave):
+        """(cuerpo, content_type, headers) de la página grabada, o None."""
+        entrada = self.indice.get(clave)
+        if entrada is None:
+            return None
+        with open(os.path.join(self.directorio, entrada["archivo"]), "r", encoding="utf-8") as f:
+            return f.read(), entrada.get("tipo", TIPO_HTML), entrada.get("headers", {})
+
+    def persistir(self):
+        with open(self.indice_path, "w", encoding="utf-8") as f:
+            json.dump(self.indice, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def tiendas_locales(base, path=None):
+    """Las tiendas del registro con sus listados apuntando al servidor de fixtures."""
+    tiendas = cargar_registro(path) if path else cargar_registro()
+    for tienda in tiendas.values():
+        tienda.urls = [url_local(url, base) for url in tienda.urls]
+        if tienda.api and tienda.api.get("base"):
+            tienda.api = {**tienda.api, "base": url_local(tienda.api["base"], base)}
+    return tiendas
+
+
+# --- Grabación -------------------------------------------------------------------------
+
+def grabar_html(tienda, fixtures):
+    """Listados y sus páginas siguientes, tal como los devuelve el servidor. Devuelve los productos leídos."""
+    products = []
+    for url in tienda.urls:
+        paginas = [url]
+        for indice, pagina in enumerate(paginas):
+            try:
+                html = descargar(pagina)
+            except requests.RequestException as e:
+                print(f"Error al grabar {pagina}: {e}")
+                continue
+            fixtures.guardar(pagina, html)
+            soup = parsear(html)
+            products.extend(armar_productos(extraer_filas(soup, tienda._css, pagina)))
+            if indice == 0 and tienda.paginacion:
+                paginas.extend(urls_restantes(pagina, tienda.paginacion, extraer_enlaces(soup, tienda._css_paginacion)))
+    return deduplicar(products)
+
+
+def grabar_selenium(tienda, fixtures, driver):
+    """Como grabar_html pero con el DOM ya renderizado por el navegador."""
+    from extraccionDom import esperar_listado, extraer_enlaces_dom, extraer_filas_dom
+
+    products = []
+    for url in tienda.urls:
+        paginas = [url]
+        for indice, pagina in enumerate(paginas):
+            driver.get(pagina)
+            esperar_listado(driver, tienda.selectores)
+            filas = extraer_filas_dom(driver, tienda.selectores)
+            fixtures.guardar(pagina, driver.page_source)
+            products.extend(armar_productos(filas))
+            if indice == 0 and tienda.paginacion:
+                enlaces = extraer_enlaces_dom(driver, tienda.paginacion["selector"])
+                paginas.extend(urls_restantes(pagina, tienda.paginacion, enlaces))
+    return deduplicar(products)
+
+
+def grabar_api(tienda, fixtures):
+    """
+    Corre el motor API de la tienda y graba cada respuesta JSON que recibe la sesión compartida
+    (prueba de la ruta, categorías y todas las páginas), con Content-Type y headers de paginación.
+    """
+    from motorApi import buscar_woocommerce
+
+    def grabar_respuesta(response, *args, **kwargs):
+        tipo = response.headers.get("Content-Type", "")
+        if response.status_code == 200 and "json" in tipo:
+            headers = {nombre: response.headers[nombre] for nombre in HEADERS_GRABADOS if nombre in response.headers}
+            fixtures.guardar(response.url, response.text, tipo, headers)
+
+    motorHtml.sesion.hooks["response"].append(grabar_respuesta)
+    try:
+        return buscar_woocommerce(tienda.api)
+    finally:
+        motorHtml.sesion.hooks["response"].remove(grabar_respuesta)
+
+
+def grabar_productos(products, fixtures):
+    for product in products[:FIXTURES_PRODUCTOS]:
+        try:
+            fixtures.guardar(product["url"], descargar(product["url"]))
+        except requests.RequestException as e:
+            print(f"Error al grabar {product['url']}: {e}")
+
+
+def abrir_navegador():
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from perfilScraping import iniciar_chrome
+    from resolverDriver import servicio_chrome
+
+    return iniciar_chrome(servicio_chrome())
+
+
+def grabar(ids=None):
+    fixtures = Fixtures()
+    driver = None
+    try:
+        for tienda in REGISTRO.values():
+            if ids and tienda.id not in ids:
+                continue
+            if tienda.motor == "selenium":
+                driver = driver or abrir_navegador()
+                products = grabar_selenium(tienda, fixtures, driver)
+            else:
+                products = grabar_html(tienda, fixtures)
+            if tienda.api and tienda.api["tipo"] == "woocommerce":
+                try:
+                    products = grabar_api(tienda, fixtures) or products
+                except Exception as e:
+                    print(f"Error al grabar la API de {tienda.id}: {e}")
+            grabar_productos(products, fixtures)
+            print(f"{tienda.id}: {len(products)} productos grabados")
+    finally:
+        if driver:
+            driver.quit()
+        fixtures.persistir()
+
+
+# --- Servidor --------------------------------------------------------------------------
+
+class _ManejadorFixtures(BaseHTTPRequestHandler):
+    fixtures = None
+
+    def do_GET(self):
+        grabada = self.fixtures.leer(self.path.lstrip("/"))
+        if FIXTURES_LATENCIA:
+            time.sleep(FIXTURES_LATENCIA)
+        if grabada is None:
+            self.send_error(404, "Sin fixture para esta URL")
+            return
+        texto, tipo, headers = grabada
+        cuerpo = texto.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        for nombre, valor in headers.items():
+            self.send_header(nombre, valor)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar_servidor(puerto=0, fixtures=None):
+    """Levanta el servidor en un hilo; devuelve (servidor, url_base). Puerto 0 = uno libre."""
+    manejador = type("Manejador", (_ManejadorFixtures,), {"fixtures": fixtures or Fixtures()})
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+if __name__ == "__main__":
+    comando = sys.argv[1] if len(sys.argv) > 1 else ""
+    if comando == "grabar":
+        grabar(set(sys.argv[2:]))
+    elif comando == "servir":
+        servidor, base = iniciar_servidor(int(sys.argv[2]) if len(sys.argv) > 2 else 8800)
+        print(f"Sirviendo {len(servidor.RequestHandlerClass.fixtures.indice)} páginas en {base}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            servidor.shutdown()
+    else:
+        print(__doc__)
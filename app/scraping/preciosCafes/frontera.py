@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from cachePrecios import CACHE_DIR
+
+# Scrapes en paralelo entre todas las tiendas: el tiempo de una vuelta completa depende de esto, no de cuántas tiendas haya
+FRONTERA_WORKERS = int(os.getenv("FRONTERA_WORKERS", os.getenv("CALENTADOR_WORKERS", "4")))
+# Tiendas del mismo dominio que se scrapean a la vez (las páginas de cada una ya tienen su límite en paginacion.py)
+FRONTERA_POR_DOMINIO = int(os.getenv("FRONTERA_POR_DOMINIO", "1"))
+# Cortesía: segundos mínimos entre dos scrapes que empiezan en el mismo dominio
+FRONTERA_CORTESIA = float(os.getenv("FRONTERA_CORTESIA", "5"))
+FRONTERA_PATH = os.getenv("FRONTERA_PATH", os.path.join(CACHE_DIR, "frontera.json"))
+
+
+def _iso(instante):
+    return datetime.fromtimestamp(instante).isoformat(timespec="seconds") if instante else None
+
+
+class Frontera:
+    """
+    Cola de scrapes pendientes con un presupuesto global de workers, un límite de concurrencia
+    y una demora de cortesía por dominio, y prioridad entre las tareas vencidas.
+
+    Cada tarea es una clave (el id de la tienda) con su instante, dominio, prioridad y datos
+    libres del que la agenda. `ejecutar(clave)` corre en uno de los workers. La cola se guarda
+    en FRONTERA_PATH en cada cambio, así un reinicio retoma la agenda (y rehace lo que quedó a medias).
+    """
+
+    def __init__(self, ejecutar, workers=FRONTERA_WORKERS, por_dominio=FRONTERA_POR_DOMINIO,
+                 cortesia=FRONTERA_CORTESIA, path=FRONTERA_PATH):
+        self.ejecutar = ejecutar
+        self.workers = workers
+        self.por_dominio = por_dominio
+        self.cortesia = cortesia
+        self.path = path
+        self._tareas = {}
+        self._en_curso = {}
+        self._activos = Counter()
+        self._ultimo_inicio = {}
+        self._condicion = threading.Condition()
+        self._detenido = False
+        self._hilo = None
+        self._executor = None
+        self._cargar()
+
+    def agendar(self, clave, instante, dominio, prioridad=0, datos=None):
+        """Agrega o reemplaza la tarea de `clave`. Si está corriendo, la nueva espera a que termine."""
+        with self._condicion:
+            self._tareas[clave] = {
+                "instante": instante,
+                "dominio": dominio,
+                "prioridad": prioridad,
+                "datos": datos or {},
+            }
+            self._persistir()
+            self._condicion.notify()
+
+    def tarea(self, clave):
+        """La tarea pendiente (o la que está corriendo) de `clave`, tal como quedó guardada."""
+        with self._condicion:
+            tarea = self._tareas.get(clave) or self._en_curso.get(clave)
+            return dict(tarea) if tarea else None
+
+    def claves(self):
+        """Claves con una tarea pendiente o corriendo."""
+        with self._condicion:
+            return set(self._tareas) | set(self._en_curso)
+
+    def quitar(self, clave):
+        """Saca la tarea pendiente de `clave` (si está corriendo, termina pero no se vuelve a agendar sola)."""
+        with self._condicion:
+            if self._tareas.pop(clave, None) is not None:
+                self._persistir()
+
+    def en_curso(self, clave):
+        with self._condicion:
+            return clave in self._en_curso
+
+    def iniciar(self):
+        with self._condicion:
+            self._detenido = False
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            self._hilo = threading.Thread(target=self._despachar, daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        with self._condicion:
+            self._detenido = True
+            self._condicion.notify()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+    def activa(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def estado(self):
+        ahora = time.time()
+        with self._condicion:
+            return {
+                "workers": self.workers,
+                "ocupados": len(self._en_curso),
+                "pendientes": len(self._tareas),
+                "vencidas": sum(1 for tarea in self._tareas.values() if tarea["instante"] <= ahora),
+                "dominios": {
+                    dominio: {"activos": self._activos[dominio], "ultimo_inicio": _iso(inicio)}
+                    for dominio, inicio in self._ultimo_inicio.items()
+                },
+                "cola": [
+                    {"clave": clave, "instante": _iso(tarea["instante"]), "dominio": tarea["dominio"],
+                     "prioridad": round(tarea["prioridad"], 3)}
+                    for clave, tarea in sorted(self._tareas.items(), key=lambda item: item[1]["instante"])
+                ],
+            }
+
+    def _siguiente(self, ahora):
+        """
+        (clave, None) con la tarea a despachar o (None, espera) con los segundos hasta que pueda haber una.
+        Entre las vencidas gana la de mayor prioridad y, a igual prioridad, la más atrasada.
+        Recorre toda la cola: con decenas o cientos de tiendas es más simple que mantener un heap por dominio.
+        """
+        elegida, mejor, espera = None, None, None
+        for clave, tarea in self._tareas.items():
+            if clave in self._en_curso:
+                continue
+            dominio = tarea["dominio"]
+            disponible = tarea["instante"]
+            if dominio in self._ultimo_inicio:
+                disponible = max(disponible, self._ultimo_inicio[dominio] + self.cortesia)
+            if self._activos[dominio] >= self.por_dominio:
+                # Se libera cuando termina un scrape del dominio, que avisa por la condición
+                continue
+            if disponible > ahora:
+                espera = min(espera, disponible - ahora) if espera is not None else disponible - ahora
+                continue
+            orden = (tarea["prioridad"], -tarea["instante"])
+            if mejor is None or orden > mejor:
+                elegida, mejor = clave, orden
+        return elegida, espera
+
+    def _despachar(self):
+        with self._condicion:
+            while not self._detenido:
+                if len(self._en_curso) >= self.workers:
+                    self._condicion.wait()
+                    continue
+                ahora = time.time()
+                clave, espera = self._siguiente(ahora)
+                if clave is None:
+                    self._condicion.wait(timeout=espera)
+                    continue
+                tarea = self._tareas.pop(clave)
+                self._en_curso[clave] = tarea
+                self._activos[tarea["dominio"]] += 1
+                self._ultimo_inicio[tarea["dominio"]] = ahora
+                self._executor.submit(self._correr, clave)
+
+    def _correr(self, clave):
+        try:
+            self.ejecutar(clave)
+        except Exception as e:
+            print(f"Error al ejecutar la tarea {clave} de la frontera: {e}")
+        finally:
+            with self._condicion:
+                tarea = self._en_curso.pop(clave)
+                self._activos[tarea["dominio"]] -= 1
+                self._persistir()
+                self._condicion.notify()
+
+    def _cargar(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._tareas = json.load(f)
+            print(f"Frontera cargada desde {self.path} ({len(self._tareas)} tareas)")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer la frontera, se empieza vacía: {e}")
+
+    def _persistir(self):
+        # Lo que está corriendo se guarda como pendiente: si el proceso muere a mitad, se rehace al volver
+        tareas = {**self._en_curso, **self._tareas}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporal = self.path + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(tareas, f, ensure_ascii=False)
+            os.replace(temporal, self.path)
+        except OSError as e:
+            print(f"Error al guardar la frontera: {e}")
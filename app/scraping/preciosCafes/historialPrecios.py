@@ -0,0 +1,295 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+from mysql.connector import Error, pooling
+
+from productos import id_producto
+
+# Misma base que el servicio `db` de docker-compose.yml
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "db"),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", "secret"),
+    "database": os.getenv("DB_NAME", "mi_base"),
+}
+
+# Máximo de filas que devuelve una consulta de historial
+HISTORIAL_LIMITE = int(os.getenv("HISTORIAL_LIMITE", "5000"))
+# Rango por defecto de los resúmenes cuando no se pasa `desde`
+RESUMEN_DIAS = int(os.getenv("HISTORIAL_RESUMEN_DIAS", "90"))
+
+# Tamaño de bucket permitido en los resúmenes (se interpola en el SQL, por eso es una lista cerrada)
+PASOS = {
+    "dia": "INTERVAL 1 DAY",
+    "semana": "INTERVAL 1 WEEK",
+}
+
+ESQUEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id BIGINT UNSIGNED NOT NULL PRIMARY KEY,
+        url VARCHAR(1024) NOT NULL,
+        shop VARCHAR(64) NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        first_seen DATETIME NOT NULL,
+        last_seen DATETIME NOT NULL,
+        KEY idx_products_shop (shop)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    # Sólo se guardan los cambios de precio: cada fila es un tramo [valid_from, valid_to)
+    # con el mismo precio. valid_to NULL = precio vigente.
+    # La clave primaria es el índice clustered de InnoDB: los tramos de un producto quedan contiguos.
+    """
+    CREATE TABLE IF NOT EXISTS price_intervals (
+        product_id BIGINT UNSIGNED NOT NULL,
+        valid_from DATETIME NOT NULL,
+        valid_to DATETIME NULL,
+        price INT NOT NULL,
+        PRIMARY KEY (product_id, valid_from)
+    ) ENGINE=InnoDB
+    """,
+]
+
+# Pasa las observaciones del esquema anterior (una fila por scrape) a tramos, quedándose
+# sólo con las filas donde cambió el precio. LEAD corre después del WHERE, así que da el
+# inicio del tramo siguiente.
+MIGRACION_OBSERVACIONES = """
+    INSERT IGNORE INTO price_intervals (product_id, valid_from, valid_to, price)
+    SELECT product_id, observed_at,
+           LEAD(observed_at) OVER (PARTITION BY product_id ORDER BY observed_at),
+           price
+    FROM (
+        SELECT product_id, observed_at, price,
+               LAG(price) OVER (PARTITION BY product_id ORDER BY observed_at) AS anterior
+        FROM price_observations
+    ) cambios
+    WHERE anterior IS NULL OR anterior <> price
+"""
+
+
+class HistorialPrecios:
+    """
+    Historial de precios en MySQL, guardando sólo las transiciones de precio.
+    El almacenamiento crece con la cantidad de cambios reales, no con la frecuencia de scrapeo.
+    La conexión se abre recién en el primer uso, así la API funciona aunque la base no esté.
+    """
+
+    def __init__(self, config=DB_CONFIG):
+        self.config = config
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _conexion(self):
+        with self._lock:
+            if self._pool is None:
+                pool = pooling.MySQLConnectionPool(pool_name="historial", pool_size=4, **self.config)
+                self._crear_esquema(pool)
+                self._pool = pool
+        return self._pool.get_connection()
+
+    def _crear_esquema(self, pool):
+        connection = pool.get_connection()
+        try:
+            cursor = connection.cursor()
+            for sentencia in ESQUEMA:
+                cursor.execute(sentencia)
+
+            cursor.execute("SHOW TABLES LIKE 'price_observations'")
+            hay_observaciones = cursor.fetchone() is not None
+            cursor.execute("SELECT 1 FROM price_intervals LIMIT 1")
+            hay_tramos = cursor.fetchone() is not None
+            if hay_observaciones and not hay_tramos:
+                cursor.execute(MIGRACION_OBSERVACIONES)
+                print(f"Historial migrado a tramos de precio: {cursor.rowcount} filas")
+
+            connection.commit()
+            cursor.close()
+        finally:
+            connection.close()
+
+    def guardar_snapshot(self, shop, products, observed_at=None):
+        """
+        Registra un scrape: actualiza los productos y abre un tramo nuevo sólo para los que
+        cambiaron de precio (o aparecieron). Los productos que ya no están en la tienda cierran
+        su tramo. Todo en una transacción y con sentencias multi-fila.
+        """
+        if not products:
+            return
+        observed_at = (observed_at or datetime.utcnow()).replace(microsecond=0)
+
+        # Una fila por producto: si la misma URL vino dos veces gana la última
+        filas = {id_producto(p["url"]): p for p in products}
+        ids = list(filas)
+        marcadores = ", ".join(["%s"] * len(ids))
+
+        productos_sql = (
+            "INSERT INTO products (id, url, shop, name, first_seen, last_seen) VALUES "
+            + ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(filas))
+            + " ON DUPLICATE KEY UPDATE name = VALUES(name), shop = VALUES(shop), last_seen = VALUES(last_seen)"
+        )
+        productos_valores = []
+        for product_id, p in filas.items():
+            productos_valores.extend([product_id, p["url"], shop, p["name"][:255], observed_at, observed_at])
+
+        connection = None
+        try:
+            connection = self._conexion()
+            cursor = connection.cursor()
+            cursor.execute(productos_sql, productos_valores)
+
+            # Precio vigente de los productos del snapshot
+            cursor.execute(
+                f"SELECT product_id, price FROM price_intervals WHERE valid_to IS NULL AND product_id IN ({marcadores})",
+                ids,
+            )
+            vigentes = dict(cursor.fetchall())
+            cambiaron = [product_id for product_id, p in filas.items() if vigentes.get(product_id) != p["price"]]
+
+            # Productos de la tienda que ya no aparecen: su tramo termina acá
+            cursor.execute(
+                f"""
+                UPDATE price_intervals i JOIN products p ON p.id = i.product_id
+                SET i.valid_to = %s
+                WHERE p.shop = %s AND i.valid_to IS NULL AND i.product_id NOT IN ({marcadores})
+                """,
+                [observed_at, shop, *ids],
+            )
+
+            if cambiaron:
+                marcadores_cambios = ", ".join(["%s"] * len(cambiaron))
+                cursor.execute(
+                    f"UPDATE price_intervals SET valid_to = %s WHERE valid_to IS NULL AND product_id IN ({marcadores_cambios})",
+                    [observed_at, *cambiaron],
+                )
+                # Dos snapshots en el mismo segundo: el tramo recién cerrado tiene la misma clave
+                # (product_id, valid_from), así que se reabre con el precio nuevo en vez de quedar cerrado
+                tramos_sql = (
+                    "INSERT INTO price_intervals (product_id, valid_from, valid_to, price) VALUES "
+                    + ", ".join(["(%s, %s, NULL, %s)"] * len(cambiaron))
+                    + " ON DUPLICATE KEY UPDATE price = VALUES(price), valid_to = NULL"
+                )
+                tramos_valores = []
+                for product_id in cambiaron:
+                    tramos_valores.extend([product_id, observed_at, filas[product_id]["price"]])
+                cursor.execute(tramos_sql, tramos_valores)
+
+            connection.commit()
+            cursor.close()
+        except Error as e:
+            print(f"Error al guardar el historial de {shop}: {e}")
+            if connection:
+                connection.rollback()
+        finally:
+            if connection:
+                connection.close()
+
+    def historial_producto(self, url, desde=None, hasta=None):
+        """Tramos de precio de un producto que se superponen con [desde, hasta]."""
+        sql = """
+            SELECT valid_from, valid_to, price
+            FROM price_intervals
+            WHERE product_id = %s AND valid_from <= %s AND (valid_to IS NULL OR valid_to > %s)
+            ORDER BY valid_from
+            LIMIT %s
+        """
+        desde, hasta = self._rango(desde, hasta)
+        filas = self._consultar(sql, (id_producto(url), hasta, desde, HISTORIAL_LIMITE))
+        return [self._tramo(*fila) for fila in filas]
+
+    def historial_tienda(self, shop, desde=None, hasta=None):
+        """Tramos de precio de todos los productos de una tienda (índice por shop + clave primaria)."""
+        sql = """
+            SELECT p.url, p.name, i.valid_from, i.valid_to, i.price
+            FROM products p
+            JOIN price_intervals i ON i.product_id = p.id
+            WHERE p.shop = %s AND i.valid_from <= %s AND (i.valid_to IS NULL OR i.valid_to > %s)
+            ORDER BY p.id, i.valid_from
+            LIMIT %s
+        """
+        desde, hasta = self._rango(desde, hasta)
+        filas = self._consultar(sql, (shop, hasta, desde, HISTORIAL_LIMITE))
+        return [{"url": fila[0], "name": fila[1], **self._tramo(*fila[2:])} for fila in filas]
+
+    def resumen_producto(self, url, paso="dia", desde=None, hasta=None):
+        """Mínimo, máximo y último precio de un producto por día o semana, calculado en MySQL."""
+        filas = self._resumen("i.product_id = %s", [id_producto(url)], paso, desde, hasta)
+        return [self._bucket(*fila[1:]) for fila in filas]
+
+    def resumen_tienda(self, shop, paso="dia", desde=None, hasta=None):
+        """Mismo resumen que resumen_producto, para cada producto de la tienda."""
+        filas = self._resumen(
+            "i.product_id IN (SELECT id FROM products WHERE shop = %s)", [shop], paso, desde, hasta
+        )
+        productos = self._nombres_tienda(shop)
+        series = {}
+        for product_id, *bucket in filas:
+            url, name = productos[product_id]
+            series.setdefault(product_id, {"url": url, "name": name, "series": []})
+            series[product_id]["series"].append(self._bucket(*bucket))
+        return list(series.values())
+
+    def _resumen(self, filtro, parametros, paso, desde, hasta):
+        if paso not in PASOS:
+            raise ValueError(f"paso debe ser uno de {', '.join(PASOS)}")
+        intervalo = PASOS[paso]
+        hasta = hasta or datetime.utcnow()
+        desde = desde or hasta - timedelta(days=RESUMEN_DIAS)
+
+        # Un bucket por día/semana del rango; cada tramo cae en todos los buckets que toca.
+        # El último precio del bucket es el del tramo que empezó más tarde dentro de él.
+        sql = f"""
+            WITH RECURSIVE buckets (inicio) AS (
+                SELECT CAST(%s AS DATETIME)
+                UNION ALL
+                SELECT inicio + {intervalo} FROM buckets WHERE inicio + {intervalo} <= %s
+            )
+            SELECT i.product_id, b.inicio,
+                   MIN(i.price), MAX(i.price),
+                   CAST(SUBSTRING_INDEX(GROUP_CONCAT(i.price ORDER BY i.valid_from DESC), ',', 1) AS SIGNED)
+            FROM buckets b
+            JOIN price_intervals i
+              ON i.valid_from < b.inicio + {intervalo}
+             AND (i.valid_to IS NULL OR i.valid_to > b.inicio)
+            WHERE {filtro}
+            GROUP BY i.product_id, b.inicio
+            ORDER BY i.product_id, b.inicio
+            LIMIT %s
+        """
+        buckets = int((hasta - desde).days / (7 if paso == "semana" else 1)) + 2
+        return self._consultar(
+            sql,
+            (desde.replace(hour=0, minute=0, second=0, microsecond=0), hasta, *parametros, HISTORIAL_LIMITE),
+            profundidad_cte=buckets,
+        )
+
+    def _nombres_tienda(self, shop):
+        filas = self._consultar("SELECT id, url, name FROM products WHERE shop = %s", (shop,))
+        return {fila[0]: (fila[1], fila[2]) for fila in filas}
+
+    def _tramo(self, valid_from, valid_to, price):
+        return {
+            "valid_from": valid_from.isoformat(),
+            "valid_to": valid_to.isoformat() if valid_to else None,
+            "price": price,
+        }
+
+    def _bucket(self, inicio, minimo, maximo, ultimo):
+        return {"desde": inicio.isoformat(), "min": minimo, "max": maximo, "last": ultimo}
+
+    def _rango(self, desde, hasta):
+        return desde or datetime(1970, 1, 1), hasta or datetime.utcnow()
+
+    def _consultar(self, sql, parametros, profundidad_cte=None):
+        connection = self._conexion()
+        try:
+            cursor = connection.cursor()
+            if profundidad_cte and profundidad_cte > 1000:
+                # MySQL corta los CTE recursivos en 1000 filas por defecto
+                cursor.execute("SET SESSION cte_max_recursion_depth = %s", (profundidad_cte,))
+            cursor.execute(sql, parametros)
+            filas = cursor.fetchall()
+            cursor.close()
+            return filas
+        finally:
+            connection.close()
@@ -0,0 +1,36 @@
+from bisect import bisect_left, bisect_right
+
+
+class IndicePrecios:
+    """
+    Productos ordenados por precio una sola vez. Los rangos se resuelven con bisect
+    y los top-k son un corte de la lista, sin ordenar en cada pedido.
+    """
+
+    def __init__(self, products, clave="price"):
+        self.clave = clave
+        self.products = sorted(
+            (product for product in products if product.get(clave) is not None),
+            key=lambda product: product[clave],
+        )
+        self.valores = [product[clave] for product in self.products]
+
+    def rango(self, minimo=None, maximo=None, limit=None, offset=0, orden="asc"):
+        """Productos con minimo <= valor <= maximo, de menor a mayor (o al revés). Devuelve (total, página)."""
+        inicio = bisect_left(self.valores, minimo) if minimo is not None else 0
+        fin = bisect_right(self.valores, maximo) if maximo is not None else len(self.valores)
+        total = max(fin - inicio, 0)
+        if orden == "desc":
+            hasta = max(fin - offset, inicio)
+            desde = inicio if limit is None else max(hasta - limit, inicio)
+            return total, self.products[desde:hasta][::-1]
+        desde = inicio + offset
+        hasta = fin if limit is None else min(fin, desde + limit)
+        return total, self.products[desde:hasta]
+
+    def top(self, k, orden="asc"):
+        if k <= 0:
+            return []
+        if orden == "desc":
+            return self.products[-k:][::-1]
+        return self.products[:k]
@@ -9,7 +9,7 @@ load_dotenv(dotenv_path='/home/tobi/develop/scraping/.env.local')
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
-COMBINED_URL = "http://192.168.1.10:5002/productosCombinados"
+API_URL = "http://192.168.1.10:5002"
 
 def enviar_mensaje_telegram(mensaje, chat_id=TELEGRAM_CHAT_ID):
     """Envía un mensaje al canal o chat de Telegram."""
@@ -30,15 +30,32 @@ def enviar_mensaje_telegram(mensaje, chat_id=TELEGRAM_CHAT_ID):
     except requests.exceptions.RequestException as e:
         print(f"Excepción al enviar el mensaje: {e}")
 
-def obtener_productos():
+def consultar_productos(ruta, params):
+    """Consulta la API de precios; el filtrado y el orden se hacen en el servidor."""
+    url = f"{API_URL}{ruta}"
     try:
-        response = requests.get(COMBINED_URL)
+        response = requests.get(url, params=params)
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        if data.get("partial"):
+            print("Catálogo parcial: alguna tienda no respondió.")
+        return data["products"]
     except Exception as e:
-        print(f"Error al obtener datos de {COMBINED_URL}: {e}")
+        print(f"Error al obtener datos de {url}: {e}")
         return []
 
+def describir_producto(product):
+    """Línea del producto con peso, origen, proceso y tueste cuando se conocen (ver enriquecimiento.py)."""
+    detalles = []
+    if product.get("weight_g"):
+        peso = product["weight_g"]
+        detalles.append(f"{peso / 1000:g}kg" if peso >= 1000 else f"{peso}g")
+    detalles.extend(product[clave] for clave in ("origin", "process") if product.get(clave))
+    if product.get("roast"):
+        detalles.append(f"tueste {product['roast']}")
+    extra = f" <i>({' · '.join(detalles)})</i>" if detalles else ""
+    return f"🔹 <b>{product['name']}</b> - ${product['price']}{extra}\n<a href='{product['url']}'>Ver producto</a>\n"
+
 def normalizar_numero(valor):
     if ',' in valor:
         return valor.replace(',', '.')
@@ -53,12 +70,6 @@ def es_numero(valor):
     except ValueError:
         return False
 
-def filter_products_by_price(products, min_price, max_price):
-    return [product for product in products if min_price <= product['price'] <= max_price]
-
-def ordenar_por_precio(products):
-    return sorted(products, key=lambda x: x['price'])
-
 def mostrar_ayuda(chat_id):
 
     mensaje_ayuda = """
@@ -133,42 +144,36 @@ Estoy aquí para ayudarte a encontrar los mejores cafés disponibles al precio q
                     enviar_mensaje_telegram("El precio mínimo no puede ser mayor que el precio máximo.", chat_id)
                     return
 
-                all_products = obtener_productos()
-                filtered_products = filter_products_by_price(all_products, min_price, max_price)
-                sorted_products = ordenar_por_precio(filtered_products)
+                sorted_products = consultar_productos("/productos", {"min": min_price, "max": max_price, "limit": 1000})
 
                 if sorted_products:
                     response_message = f"<b>Cafés en el rango de ${min_price} a ${max_price}:</b>\n"
                     for product in sorted_products:
-                        response_message += f"🔹 <b>{product['name']}</b> - ${product['price']}\n<a href='{product['url']}'>Ver producto</a>\n"
+                        response_message += describir_producto(product)
                 else:
                     response_message = f"No se encontraron cafés en el rango de ${min_price} a ${max_price}."
 
                 enviar_mensaje_telegram(response_message, chat_id)
 
             elif "cafe mas barato" in text:
-                all_products = obtener_productos()
-                sorted_products = ordenar_por_precio(all_products)
+                top_3_cheapest = consultar_productos("/productos/top", {"orden": "asc", "k": 3})
 
-                if sorted_products:
-                    top_3_cheapest = sorted_products[:3]
+                if top_3_cheapest:
                     response_message = "<b>Top 3 cafés más baratos:</b>\n"
                     for product in top_3_cheapest:
-                        response_message += f"🔹 <b>{product['name']}</b> - ${product['price']}\n<a href='{product['url']}'>Ver producto</a>\n"
+                        response_message += describir_producto(product)
                 else:
                     response_message = "No se encontraron cafés disponibles."
 
                 enviar_mensaje_telegram(response_message, chat_id)
 
             elif "cafe mas caro" in text:
-                all_products = obtener_productos()
-                sorted_products = ordenar_por_precio(all_products)
+                top_3_expensive = consultar_productos("/productos/top", {"orden": "desc", "k": 3})
 
-                if sorted_products:
-                    top_3_expensive = sorted_products[-3:]
+                if top_3_expensive:
                     response_message = "<b>Top 3 cafés más caros:</b>\n"
                     for product in top_3_expensive:
-                        response_message += f"🔹 <b>{product['name']}</b> - ${product['price']}\n<a href='{product['url']}'>Ver producto</a>\n"
+                        response_message += describir_producto(product)
                 else:
                     response_message = "No se encontraron cafés disponibles."
 
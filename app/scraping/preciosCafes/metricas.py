@@ -0,0 +1,175 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# Métricas en memoria con salida en el formato de texto de Prometheus (GET /metrics).
+# Registrar un valor es un lock y una suma: se puede llamar en cada página sin costo apreciable.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Buckets (segundos) para cargas de página y scrapes, y para el arranque de Chrome
+BUCKETS_PAGINA = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+BUCKETS_ARRANQUE = (0.5, 1, 2, 3, 5, 8, 13, 20, 30)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas(nombres, valores, extra=None):
+    pares = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas[nombre]) for nombre in self.etiquetas)
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        with self._lock:
+            valores = list(self._valores.items())
+        for clave, valor in valores:
+            lineas.extend(self._lineas(clave, valor))
+        return lineas
+
+    def _lineas(self, clave, valor):
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, valor=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+
+class Medidor(_Metrica):
+    """Gauge. Con `funcion` el valor se lee al exponer (ej. navegadores activos del pool)."""
+    tipo = "gauge"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), funcion=None):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.funcion = funcion
+
+    def set(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+
+    def exponer(self):
+        if self.funcion is not None:
+            try:
+                self.set(self.funcion())
+            except Exception as e:
+                print(f"Error al leer la métrica {self.nombre}: {e}")
+        return super().exponer()
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_PAGINA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observar(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._valores.get(clave)
+            if serie is None:
+                serie = self._valores[clave] = {"conteos": [0] * len(self.buckets), "suma": 0.0, "total": 0}
+            serie["conteos"][indice] += 1
+            serie["suma"] += valor
+            serie["total"] += 1
+
+    @contextmanager
+    def cronometrar(self, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def medir(self, funcion, **etiquetas):
+        """Envuelve una función para que cada llamada se observe en el histograma."""
+        @wraps(funcion)
+        def medida(*args, **kwargs):
+            with self.cronometrar(**etiquetas):
+                return funcion(*args, **kwargs)
+        return medida
+
+    def _lineas(self, clave, serie):
+        lineas = []
+        acumulado = 0
+        for limite, conteo in zip(self.buckets, serie["conteos"]):
+            acumulado += conteo
+            le = 'le="' + _numero(limite) + '"'
+            lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}")
+        lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(serie['suma'])}")
+        lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {serie['total']}")
+        return lineas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas = []
+
+    def registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def exponer(self):
+        lineas = []
+        for metrica in self._metricas:
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+METRICAS = RegistroMetricas()
+
+CARGA_PAGINA = METRICAS.registrar(Histograma(
+    "scraping_carga_pagina_segundos", "Descarga (HTML) o driver.get (Selenium) de una página del listado.",
+    ("tienda", "motor")))
+EXTRACCION = METRICAS.registrar(Histograma(
+    "scraping_extraccion_segundos", "Parseo y extracción de productos de una página ya cargada.",
+    ("tienda", "motor")))
+SCRAPE_TIENDA = METRICAS.registrar(Histograma(
+    "scraping_tienda_segundos", "Scrape completo de una tienda, con todas sus páginas.", ("tienda",)))
+ARRANQUE_CHROME = METRICAS.registrar(Histograma(
+    "chrome_arranque_segundos", "Tiempo de setup_driver(): lanzar Chrome y chromedriver.", buckets=BUCKETS_ARRANQUE))
+PRODUCTOS = METRICAS.registrar(Medidor(
+    "scraping_productos", "Productos encontrados en el último scrape de la tienda.", ("tienda",)))
+SIN_PRODUCTOS = METRICAS.registrar(Contador(
+    "scraping_sin_productos_total", "Scrapes que terminaron sin productos.", ("tienda",)))
+CACHE_CONSULTAS = METRICAS.registrar(Contador(
+    "cache_consultas_total", "Lecturas del catálogo de una tienda por resultado de la cache (hit, stale, miss...).",
+    ("tienda", "estado")))
+DETALLES = METRICAS.registrar(Contador(
+    "scraping_detalles_total",
+    "Páginas de producto del enriquecimiento por resultado (descargado, no_modificado, vigente, pospuesto, error).",
+    ("tienda", "resultado")))
+EVENTOS_CATALOGO = METRICAS.registrar(Contador(
+    "catalogo_eventos_total", "Eventos del diff de catálogos (nuevo, quitado, baja, suba).", ("tipo",)))
@@ -0,0 +1,183 @@
+import html
+import json
+import os
+import threading
+from functools import lru_cache
+from urllib.parse import urlencode, urljoin
+
+import requests
+import soupsieve
+
+from motorHtml import HTTP_TIMEOUT, descargar_json
+from paginacion import MAX_PAGINAS, descargar_paginas
+
+# Motor "api": los datos estructurados que publican las propias tiendas, en vez del HTML del listado.
+# - woocommerce: Store API (/wp-json/wc/store/v1/products), paginada con X-WP-TotalPages.
+# - tiendanube: el JSON de variantes (data-variants) que cada producto trae en el listado.
+# Todos los productos salen con name, price y url como los demás motores, más regular_price,
+# on_sale, in_stock y variants.
+
+WOOCOMMERCE_POR_PAGINA = int(os.getenv("WOOCOMMERCE_POR_PAGINA", "100"))
+# La v1 es la ruta estable desde WooCommerce 6; las instalaciones viejas sólo tienen la ruta sin versión
+RUTAS_WOOCOMMERCE = ("/wp-json/wc/store/v1", "/wp-json/wc/store")
+
+TIENDANUBE_TARJETA = ".js-item-product"
+TIENDANUBE_NOMBRE = ".js-item-name"
+TIENDANUBE_ENLACE = "a.item-link, a.js-item-name, a[href]"
+
+_categorias = {}
+_rutas = {}
+_lock = threading.Lock()
+
+
+class ApiNoDisponible(Exception):
+    """La tienda no expone la API (o no la encontró); se usa el scraping del DOM."""
+
+
+@lru_cache(maxsize=None)
+def _css(selector):
+    return soupsieve.compile(selector)
+
+
+# --- WooCommerce Store API ----------------------------------------------------------------
+
+def _monto(valor, unidad):
+    """Los montos de la Store API vienen como texto en la unidad mínima de la moneda ("1250000" = $12.500,00)."""
+    if valor in (None, ""):
+        return None
+    return int(valor) // unidad
+
+
+def producto_woocommerce(item):
+    precios = item.get("prices") or {}
+    unidad = 10 ** int(precios.get("currency_minor_unit") or 0)
+    price = _monto(precios.get("price"), unidad)
+    if price is None or not item.get("permalink"):
+        return None
+    return {
+        "name": html.unescape(item.get("name", "")).strip(),
+        "price": price,
+        "url": item["permalink"],
+        "regular_price": _monto(precios.get("regular_price"), unidad),
+        "on_sale": bool(item.get("on_sale")),
+        "in_stock": bool(item.get("is_in_stock", True)),
+        "variants": [
+            {
+                "id": variante.get("id"),
+                "attributes": [atributo["value"] for atributo in variante.get("attributes", [])],
+            }
+            for variante in item.get("variations", [])
+        ],
+    }
+
+
+def _ruta_woocommerce(base, timeout):
+    """Prefijo de la Store API que responde en esta tienda; se averigua una vez por proceso."""
+    with _lock:
+        if base in _rutas:
+            return _rutas[base]
+    for ruta in RUTAS_WOOCOMMERCE:
+        try:
+            descargar_json(f"{base}{ruta}/products?per_page=1", timeout)
+        except requests.HTTPError:
+            continue
+        with _lock:
+            _rutas[base] = ruta
+        return ruta
+    raise ApiNoDisponible(f"{base} no expone la Store API de WooCommerce")
+
+
+def _categoria_woocommerce(base, ruta, slug, timeout):
+    """ID de la categoría a partir de su slug (la Store API filtra por ID)."""
+    clave = (base, slug)
+    with _lock:
+        if clave in _categorias:
+            return _categorias[clave]
+    categorias, _ = descargar_json(f"{base}{ruta}/products/categories?per_page=100", timeout)
+    for categoria in categorias:
+        if categoria.get("slug") == slug:
+            with _lock:
+                _categorias[clave] = categoria["id"]
+            return categoria["id"]
+    raise ApiNoDisponible(f"{base} no tiene la categoría {slug}")
+
+
+def buscar_woocommerce(api, timeout=HTTP_TIMEOUT):
+    """
+    Todos los productos de la Store API. La primera página dice cuántas hay (X-WP-TotalPages);
+    las demás se piden en paralelo con el mismo límite por dominio que los listados.
+    """
+    base = api["base"].rstrip("/")
+    ruta = _ruta_woocommerce(base, timeout)
+    parametros = {"per_page": WOOCOMMERCE_POR_PAGINA}
+    if api.get("categoria"):
+        parametros["category"] = _categoria_woocommerce(base, ruta, api["categoria"], timeout)
+
+    def url_pagina(numero):
+        return f"{base}{ruta}/products?{urlencode({**parametros, 'page': numero})}"
+
+    def pagina(url):
+        items, _ = descargar_json(url, timeout)
+        return [product for product in map(producto_woocommerce, items) if product]
+
+    items, headers = descargar_json(url_pagina(1), timeout)
+    products = [product for product in map(producto_woocommerce, items) if product]
+    total_paginas = min(int(headers.get("X-WP-TotalPages", "1") or 1), MAX_PAGINAS)
+    products.extend(descargar_paginas([url_pagina(numero) for numero in range(2, total_paginas + 1)], pagina))
+    return products
+
+
+# --- Tiendanube --------------------------------------------------------------------------
+
+def _opciones(variante):
+    return [variante[clave] for clave in ("option0", "option1", "option2") if variante.get(clave)]
+
+
+def _entero(valor):
+    return int(round(valor)) if valor is not None else None
+
+
+def extraer_tiendanube(soup, url_base, api):
+    """
+    Productos del listado de una tienda Tiendanube a partir del JSON data-variants de cada tarjeta:
+    precio, precio de lista, stock y variantes sin depender de cómo el tema muestra el precio.
+    """
+    products = []
+    for tarjeta in _css(api.get("tarjeta", TIENDANUBE_TARJETA)).select(soup):
+        datos = tarjeta if tarjeta.has_attr("data-variants") else tarjeta.select_one("[data-variants]")
+        nombre = _css(api.get("nombre", TIENDANUBE_NOMBRE)).select_one(tarjeta)
+        enlace = _css(api.get("enlace", TIENDANUBE_ENLACE)).select_one(tarjeta)
+        if datos is None or nombre is None or enlace is None:
+            continue
+        try:
+            variantes = json.loads(datos["data-variants"])
+        except ValueError:
+            continue
+        variantes = [
+            variante for variante in variantes
+            if variante.get("is_visible", True) and variante.get("price_number") is not None
+        ]
+        if not variantes:
+            continue
+
+        mas_barata = min(variantes, key=lambda variante: variante["price_number"])
+        products.append({
+            "name": nombre.get_text(" ", strip=True),
+            "price": _entero(mas_barata["price_number"]),
+            "url": urljoin(url_base, enlace.get("href", "")),
+            "regular_price": _entero(mas_barata.get("compare_at_price_number") or mas_barata["price_number"]),
+            "on_sale": mas_barata.get("compare_at_price_number") is not None,
+            "in_stock": any(variante.get("available", True) for variante in variantes),
+            "variants": [
+                {
+                    "id": variante.get("id"),
+                    "attributes": _opciones(variante),
+                    "price": _entero(variante["price_number"]),
+                    "regular_price": _entero(variante.get("compare_at_price_number") or variante["price_number"]),
+                    "in_stock": bool(variante.get("available", True)),
+                    "stock": variante.get("stock"),
+                }
+                for variante in variantes
+            ],
+        })
+    return products
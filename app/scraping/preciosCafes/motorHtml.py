@@ -0,0 +1,107 @@
+import os
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# lxml es bastante más rápido que el parser de la librería estándar; si no está se usa el de Python
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0 Safari/537.36",
+    "Accept-Language": "es-AR,es;q=0.9",
+}
+
+
+def crear_sesion():
+    """Sesión HTTP con keep-alive y reintentos, compartida por todas las tiendas."""
+    sesion = requests.Session()
+    sesion.headers.update(HEADERS)
+    reintentos = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=reintentos)
+    sesion.mount("http://", adapter)
+    sesion.mount("https://", adapter)
+    return sesion
+
+
+sesion = crear_sesion()
+
+
+def descargar(url, timeout=HTTP_TIMEOUT):
+    response = sesion.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def descargar_json(url, timeout=HTTP_TIMEOUT):
+    """GET de una API JSON con la misma sesión; devuelve (datos, headers)."""
+    response = sesion.get(url, timeout=timeout, headers={"Accept": "application/json"})
+    response.raise_for_status()
+    return response.json(), response.headers
+
+
+def descargar_condicional(url, etag=None, last_modified=None, timeout=HTTP_TIMEOUT):
+    """
+    GET con revalidación (If-None-Match / If-Modified-Since). Devuelve (html, headers);
+    html es None si el servidor respondió 304 (la copia que se tiene sigue vigente).
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    response = sesion.get(url, timeout=timeout, headers=headers)
+    if response.status_code == 304:
+        return None, response.headers
+    response.raise_for_status()
+    return response.text, response.headers
+
+
+def parsear(html):
+    return BeautifulSoup(html, PARSER)
+
+
+def extraer_filas(soup, css, url_base):
+    """
+    Aplica los selectores de la tienda al HTML parseado y devuelve filas (nombre, precio, url).
+    `css` son los selectores ya compilados con soupsieve (ver registroTiendas.Tienda).
+    """
+
+    if css.get("tarjeta"):
+        filas = []
+        for tarjeta in css["tarjeta"].select(soup):
+            nombre = css["nombre"].select_one(tarjeta)
+            precio = css["precio"].select_one(tarjeta)
+            enlace = css["enlace"].select_one(tarjeta) if css.get("enlace") else tarjeta
+            if not nombre or not precio or not enlace or not enlace.get("href"):
+                continue
+            filas.append((
+                nombre.get_text(" ", strip=True),
+                precio.get_text(strip=True),
+                urljoin(url_base, enlace["href"]),
+            ))
+        return filas
+
+    nombres = css["nombre"].select(soup)
+    precios = css["precio"].select(soup)
+    enlaces = css["enlace"].select(soup)
+    if not nombres or not precios or not enlaces:
+        return []
+    return [
+        (nombre.get_text(" ", strip=True), precio.get_text(strip=True), urljoin(url_base, enlace.get("href", "")))
+        for nombre, precio, enlace in zip(nombres, precios, enlaces)
+    ]
+
+
+def extraer_enlaces(soup, patron):
+    """Texto y href de los elementos que coinciden con un selector compilado (ej. la paginación)."""
+    return [(enlace.get_text(strip=True), enlace.get("href", "")) for enlace in patron.select(soup)]
@@ -0,0 +1,126 @@
+import html
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+
+from diffCatalogo import BAJA, NUEVO, QUITADO, SUBA
+
+# El mismo envío (y la misma carga del .env.local) que usa el bot de Telegram
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from botTelegram.telegramBot import TELEGRAM_TOKEN, enviar_mensaje_telegram  # noqa: E402
+
+# Sin token no hay a quién avisar; NOTIFICADOR_ACTIVO=0 lo apaga aunque haya
+NOTIFICADOR_ACTIVO = os.getenv("NOTIFICADOR_ACTIVO", "1") != "0" and bool(TELEGRAM_TOKEN)
+# Productos por sección del aviso; el resto se resume en "y N más"
+NOTIFICADOR_MAXIMO_POR_TIPO = int(os.getenv("NOTIFICADOR_MAXIMO_POR_TIPO", "10"))
+# Telegram rechaza (no corta) los mensajes de más de 4096 caracteres: el aviso se parte en varios
+TELEGRAM_MAXIMO_CARACTERES = 4096
+
+TITULO = "<b>☕ Cambios en los cafés</b>"
+
+SECCIONES = (
+    (BAJA, "🔻 Bajaron de precio"),
+    (NUEVO, "🆕 Nuevos"),
+    (SUBA, "🔺 Subieron de precio"),
+    (QUITADO, "❌ Ya no están"),
+)
+
+
+def _linea(evento):
+    nombre = html.escape(evento["name"])
+    enlace = f"<a href='{html.escape(evento['url'], quote=True)}'>{nombre}</a>"
+    if "old_price" in evento:
+        variacion = f"{evento['porcentaje']:+g}%"
+        return f"• {enlace} ({evento['tienda']}): ${evento['old_price']} → ${evento['price']} ({variacion})"
+    return f"• {enlace} ({evento['tienda']}): ${evento['price']}"
+
+
+def _lineas(eventos, maximo):
+    """(encabezado de la sección, línea, eventos que cuenta) por tipo; las bajas más grandes primero."""
+    por_tipo = {}
+    for evento in eventos:
+        por_tipo.setdefault(evento["tipo"], []).append(evento)
+    for tipo in (BAJA, SUBA):
+        por_tipo.get(tipo, []).sort(key=lambda evento: abs(evento["porcentaje"]), reverse=True)
+
+    for tipo, titulo in SECCIONES:
+        grupo = por_tipo.get(tipo)
+        if not grupo:
+            continue
+        encabezado = f"\n<b>{titulo} ({len(grupo)}):</b>"
+        for evento in grupo[:maximo]:
+            yield encabezado, _linea(evento), [evento]
+        if len(grupo) > maximo:
+            yield encabezado, f"<i>y {len(grupo) - maximo} más</i>", grupo[maximo:]
+
+
+def armar_mensajes(eventos, maximo=NOTIFICADOR_MAXIMO_POR_TIPO, limite=TELEGRAM_MAXIMO_CARACTERES):
+    """
+    El aviso de una tanda de eventos, partido en mensajes de a lo sumo `limite` caracteres.
+    Devuelve [(texto, eventos que cuenta)]; una sección cortada repite su encabezado en el mensaje siguiente.
+    """
+    mensajes = []
+    partes, incluidos, seccion = [TITULO], [], None
+    for encabezado, linea, suyos in _lineas(eventos, maximo):
+        agregado = [linea] if encabezado == seccion else [encabezado, linea]
+        if incluidos and len("\n".join(partes + agregado)) > limite:
+            mensajes.append(("\n".join(partes), incluidos))
+            partes, incluidos, agregado = [TITULO], [], [encabezado, linea]
+        partes.extend(agregado)
+        incluidos.extend(suyos)
+        seccion = encabezado
+    if incluidos:
+        mensajes.append(("\n".join(partes), incluidos))
+    return mensajes
+
+
+class Notificador:
+    """
+    Junta los eventos del diff (diffCatalogo.py) y los manda en un solo aviso por vuelta del
+    calentador: `vaciar()` se engancha en Calentador.al_terminar_vuelta, que se llama cuando
+    todas las tiendas terminaron su refresco, bien o mal. Si Telegram no acepta un mensaje,
+    sus eventos y los de los mensajes siguientes vuelven a la cola para la próxima vuelta.
+    """
+
+    def __init__(self, cola, enviar=enviar_mensaje_telegram):
+        self.cola = cola
+        self.enviar = enviar
+        self._lock = threading.Lock()
+        self._ultimo_envio = None
+        self._enviados = 0
+
+    def estado(self):
+        return {
+            "activo": NOTIFICADOR_ACTIVO,
+            "eventos_en_cola": self.cola.qsize(),
+            "mensajes_enviados": self._enviados,
+            "ultimo_envio": self._ultimo_envio,
+        }
+
+    def tanda(self):
+        """Todos los eventos encolados hasta ahora."""
+        eventos = []
+        while True:
+            try:
+                eventos.append(self.cola.get_nowait())
+            except queue.Empty:
+                return eventos
+
+    def vaciar(self):
+        notificados, pendientes = 0, []
+        with self._lock:
+            for texto, eventos in armar_mensajes(self.tanda()):
+                if pendientes or not self.enviar(texto):
+                    pendientes.extend(eventos)
+                    continue
+                notificados += len(eventos)
+                self._enviados += 1
+                self._ultimo_envio = datetime.now().isoformat(timespec="seconds")
+            for evento in pendientes:
+                self.cola.put(evento)
+        if notificados:
+            print(f"Notificados {notificados} cambios del catálogo")
+        if pendientes:
+            print(f"Error al notificar {len(pendientes)} cambios del catálogo, se reintentan en la próxima vuelta")
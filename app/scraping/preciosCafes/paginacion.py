@@ -0,0 +1,82 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse, urlunparse
+
+# Máximo de páginas descargándose a la vez contra un mismo dominio
+PAGINAS_POR_DOMINIO = int(os.getenv("PAGINAS_POR_DOMINIO", "3"))
+# Tope de páginas por listado, por si la detección lee un número absurdo
+MAX_PAGINAS = int(os.getenv("MAX_PAGINAS", "30"))
+
+_semaforos = {}
+_semaforos_lock = threading.Lock()
+
+executor_paginas = ThreadPoolExecutor(max_workers=int(os.getenv("PAGINAS_WORKERS", "12")))
+
+# Reglas de paginación que puede declarar una tienda en tiendas.json:
+# - {"tipo": "parametro", "parametro": "mpage", "selector": "..."}  ->  listado/?mpage=N  (Tiendanube)
+# - {"tipo": "ruta", "plantilla": "page/{n}/", "selector": "..."}  ->  listado/page/N/  (WooCommerce)
+# "selector" son los enlaces de paginación de la primera página, de donde se saca la cantidad de páginas.
+
+
+def semaforo_dominio(url):
+    """Semáforo compartido por todas las descargas a un mismo dominio."""
+    dominio = urlparse(url).netloc
+    with _semaforos_lock:
+        if dominio not in _semaforos:
+            _semaforos[dominio] = threading.BoundedSemaphore(PAGINAS_POR_DOMINIO)
+        return _semaforos[dominio]
+
+
+def url_pagina(url, regla, numero):
+    if regla["tipo"] == "parametro":
+        partes = urlparse(url)
+        query = parse_qs(partes.query)
+        query[regla["parametro"]] = [str(numero)]
+        return urlunparse(partes._replace(query=urlencode(query, doseq=True)))
+    if regla["tipo"] == "ruta":
+        return urljoin(url, regla["plantilla"].format(n=numero))
+    raise ValueError(f"Tipo de paginación desconocido: {regla['tipo']}")
+
+
+def _numero_en_href(href, regla):
+    if regla["tipo"] == "parametro":
+        valores = parse_qs(urlparse(href).query).get(regla["parametro"])
+        return valores[0] if valores else None
+    patron = re.escape(regla["plantilla"]).replace(re.escape("{n}"), r"(\d+)")
+    coincidencia = re.search(patron, href)
+    return coincidencia.group(1) if coincidencia else None
+
+
+def contar_paginas(enlaces, regla):
+    """
+    Cantidad de páginas del listado según los enlaces de paginación [(texto, href)].
+    Se toma el mayor número que aparezca en el texto o en la URL de los enlaces.
+    """
+    total = 1
+    for texto, href in enlaces:
+        for candidato in (texto.strip(), _numero_en_href(href or "", regla)):
+            if candidato and candidato.isdigit():
+                total = max(total, int(candidato))
+    return min(total, MAX_PAGINAS)
+
+
+def urls_restantes(url, regla, enlaces):
+    """URLs de la página 2 en adelante, ya descubierta la cantidad desde la primera."""
+    return [url_pagina(url, regla, numero) for numero in range(2, contar_paginas(enlaces, regla) + 1)]
+
+
+def descargar_paginas(urls, descargar_una):
+    """
+    Descarga las páginas en paralelo, como mucho PAGINAS_POR_DOMINIO a la vez por dominio.
+    `descargar_una(url)` devuelve la lista de productos de esa página.
+    """
+    def con_limite(url):
+        with semaforo_dominio(url):
+            return descargar_una(url)
+
+    products = []
+    for resultado in executor_paginas.map(con_limite, urls):
+        products.extend(resultado)
+    return products
@@ -1,317 +1,585 @@
-from flask import Flask, request, jsonify
-import re
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
+from flask import Flask, Response, request, jsonify
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from driverPool import DriverPool, PoolAgotado
+from admision import ControlAdmision, SingleFlight, Saturado
+from cachePrecios import CachePrecios
+from calentador import Calentador
+from circuito import CircuitoAbierto, Circuitos
+from metricas import ARRANQUE_CHROME, CACHE_CONSULTAS, CONTENT_TYPE, METRICAS, PRODUCTOS, SCRAPE_TIENDA, SIN_PRODUCTOS, Medidor
+from registroTiendas import REGISTRO
+from catalogo import Catalogo, VistaCatalogo, id_publico
+from busqueda import IndiceBusqueda
+from historialPrecios import HistorialPrecios
+from enriquecimiento import ENRIQUECIMIENTO_ACTIVO, Enriquecedor
+from precioKilo import agregar_precio_kilo
+from diffCatalogo import DiffCatalogo
+from notificador import NOTIFICADOR_ACTIVO, Notificador
+from mysql.connector import Error
+
+# Perfil de scraping y resolución de chromedriver compartidos con el resto de los scrapers (carpeta padre)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from perfilScraping import iniciar_chrome
+from resolverDriver import ruta_chromedriver, servicio_chrome
 
 app = Flask(__name__)
 
+# Referencias para medir el arranque y el tiempo hasta el primer scrape
+INICIO_PROCESO = time.perf_counter()
+primer_scrape = threading.Event()
+
+@ARRANQUE_CHROME.medir
 def setup_driver():
-    service = Service(ChromeDriverManager().install())
+    service = servicio_chrome()
     options = Options()
-    options.add_argument("--headless")  # Ejecutar en modo sin cabeza
     options.add_argument("--no-sandbox")  # Asegura que Chrome pueda ejecutarse en Docker
     options.add_argument("--disable-dev-shm-usage")
-    return webdriver.Chrome(service=service, options=options)
+    # Headless, carga eager y sin imágenes, fuentes ni scripts de terceros
+    return iniciar_chrome(service, options)
 
 
-def normalize_price(price):
-    """
-    Normaliza el precio eliminando caracteres no numéricos excepto el punto.
-    Convierte el precio a un número flotante para consistencia.
-    """
-    price_cleaned = re.sub(r'[^\d]', '', price)  # Elimina caracteres no numéricos
-    return int(price_cleaned)
+# Pool de navegadores reutilizables compartido por todas las rutas. La admisión limita
+# cuántas sesiones corren a la vez y cuántas esperan; el resto recibe 503 + Retry-After.
+admision_navegadores = ControlAdmision()
+driver_pool = DriverPool(setup_driver, admision=admision_navegadores)
 
-def search_coffee(driver):
-    url = "https://fuegotostadores.com/cafe-de-especialidad/"
-    driver.get(url)
-    products = []
-    try:
-        price_spans = driver.find_elements(By.CSS_SELECTOR, "span.js-price-display.item-price")
-        product_titles = driver.find_elements(By.CSS_SELECTOR, "a.js-item-name.item-name")
-        product_links = driver.find_elements(By.CSS_SELECTOR, "a.js-item-name.item-name")
-
-        if not price_spans or not product_titles or not product_links:
-            print("No se encontraron precios, nombres o enlaces de productos.")
-            return []
-
-        for span, title, product_link in zip(price_spans, product_titles, product_links):
-            product_name = title.text
-            product_href = product_link.get_attribute("href")
-            price = normalize_price(span.text)
-
-            products.append({
-                "name": product_name,
-                "price": price,
-                "url": product_href
-            })
-    except Exception as e:
-        print("Error al extraer información de la página:", e)
+METRICAS.registrar(Medidor("navegadores_activos", "Sesiones de navegador en uso.",
+                           funcion=lambda: admision_navegadores.estado()["activos"]))
+METRICAS.registrar(Medidor("navegadores_en_cola", "Pedidos esperando un navegador libre.",
+                           funcion=lambda: admision_navegadores.estado()["en_cola"]))
+METRICAS.registrar(Medidor("navegadores_libres", "Drivers abiertos y libres en el pool.",
+                           funcion=lambda: driver_pool.estado()["libres"]))
 
-    return products
+# Pedidos concurrentes a la misma tienda comparten un único scrape en curso
+scrapes_en_vuelo = SingleFlight()
 
-def search_delirante(driver):
-    url = "https://cafedelirante.com.ar/tienda/cafe/"
-    driver.get(url)
-    products = []
-    try:
-        price_spans = driver.find_elements(By.CSS_SELECTOR, "span.woocommerce-Price-amount.amount")
-        product_titles = driver.find_elements(By.CSS_SELECTOR, "p.name.product-title > a.woocommerce-LoopProduct-link")
-        product_links = driver.find_elements(By.CSS_SELECTOR, "p.name.product-title > a.woocommerce-LoopProduct-link")
-
-        if not price_spans or not product_titles or not product_links:
-            print("No se encontraron precios, nombres o enlaces de productos.")
-            return []
-
-        for span, title, product_link in zip(price_spans, product_titles, product_links):
-            product_name = title.text
-            product_href = product_link.get_attribute("href")
-            price = normalize_price(span.text)
-
-            products.append({
-                "name": product_name,
-                "price": price,
-                "url": product_href
-            })
-    except Exception as e:
-        print("Error al extraer información de la página:", e)
 
-    return products
+# Las tiendas que exceden su timeout siguen ocupando un hilo hasta terminar,
+# por eso hay margen para dos rondas completas.
+executor_tiendas = ThreadPoolExecutor(max_workers=len(REGISTRO) * 2)
 
-def search_avo(driver):
-    url = "https://www.avocoffeeroasters.com.ar/cafe--prod--1"
-    driver.get(url)
-    products = []
-    try:
-        price_spans = driver.find_elements(By.CSS_SELECTOR, "div.price > span")
-        product_links = driver.find_elements(By.CSS_SELECTOR, "h4 > a.titprod")
-
-        if not price_spans or not product_links:
-            print("No se encontraron precios o enlaces de productos.")
-            return []
-
-        for span, product_link in zip(price_spans, product_links):
-            product_name = product_link.text
-            product_href = product_link.get_attribute("href")
-            price = normalize_price(span.text)
-
-            products.append({
-                "name": product_name,
-                "price": price,
-                "url": product_href
-            })
-    except Exception as e:
-        print("Error al extraer información de la página:", e)
+cache_precios = CachePrecios()
 
-    return products
+# Catálogo combinado versionado (ETag y /productos/cambios)
+catalogo = Catalogo()
+# Versión e índices por precio y por precio por kilo, rearmados en cada escritura de la cache:
+# los pedidos sólo leen la foto ya calculada, sin copiar, ordenar ni hashear el catálogo
+vista_catalogo = VistaCatalogo(REGISTRO, catalogo, claves=("price", "price_per_kg"))
+cache_precios.suscribir(vista_catalogo.actualizar_tienda)
 
-#normaliza mal el precio
-def search_puerto_blast(driver):
-    url = "https://cafepuertoblest.com/cafe-especial/?mpage=2"  
-    driver.get(url)
-    products = []
+# Índice de búsqueda por nombre; cada tienda se reindexa cuando se refresca su catálogo
+indice_busqueda = IndiceBusqueda()
+cache_precios.suscribir(indice_busqueda.actualizar_tienda)
 
-    try:
-        # Buscar todos los productos en la página
-        product_elements = driver.find_elements(By.CSS_SELECTOR, "a.item-link")  # Encuentra todos los enlaces de productos
-
-        if not product_elements:
-            print("No se encontraron productos en la página.")
-            return []
-
-        for product_element in product_elements:
-            product_name = product_element.find_element(By.CSS_SELECTOR, "div.js-item-name").text  # Título
-            product_url = product_element.get_attribute("href")  # Enlace
-            price_element = product_element.find_element(By.CSS_SELECTOR, "span.js-price-display.item-price")  # Precio
-            price = normalize_price(price_element.text)  # Normaliza el precio
-
-            # Guardar los productos encontrados
-            products.append({
-                "name": product_name,
-                "price": price,
-                "url": product_url
-            })
 
-    except Exception as e:
-        print("Error al extraer información de la página:", e)
+# Un solo hilo escribe el historial: los snapshots se insertan en orden y sin competir entre sí
+historial = HistorialPrecios()
+executor_historial = ThreadPoolExecutor(max_workers=1)
 
-    return products
 
-def search_MomoTostadores(driver):
-    url = "https://momotostadores.com/"  
-    driver.get(url)
-    products = []
+# Un circuit breaker por tienda: una tienda caída se saltea durante el enfriamiento en vez de
+# hacer esperar su timeout completo, y el timeout de cada tienda sigue a su p95 observado.
+circuitos = Circuitos(REGISTRO.values())
+
+enriquecedor = Enriquecedor()
 
-    try:
-        # Buscar los enlaces de los productos
-        product_links = driver.find_elements(By.CSS_SELECTOR, "a.pp-loop-product__link")
-        price_elements = driver.find_elements(By.CSS_SELECTOR, "span.price > span.woocommerce-Price-amount.amount bdi")
-
-        if not product_links or not price_elements:
-            print("No se encontraron productos o precios en la página.")
-            return []
-
-        # Iterar sobre los productos encontrados
-        for product_link, price_element in zip(product_links, price_elements):
-            product_name = product_link.find_element(By.CSS_SELECTOR, "h3.woocommerce-loop-product__title").text
-            product_url = product_link.get_attribute("href")
-            price = price_element.text.strip()  # Obtener texto del precio desde el <bdi>
-
-            # Normalizar el precio
-            normalized_price = normalize_price(price)
-
-            # Guardar los productos encontrados
-            products.append({
-                "name": product_name,
-                "price": normalized_price,
-                "url": product_url
-            })
 
+def scrapear_y_guardar(tienda):
+    """Scrapea una tienda y deja el snapshot en MySQL sin demorar la respuesta."""
+    circuito = circuitos[tienda.id]
+    circuito.permitir()
+    inicio = time.monotonic()
+    try:
+        products = tienda.scrapear(driver_pool, circuito.timeout())
+    except (Saturado, PoolAgotado):
+        # Falta de navegadores: no dice nada de la tienda
+        circuito.descartar()
+        raise
     except Exception as e:
-        print(f"Error al extraer los productos de Momo Tostadores: {e}")
+        circuito.fallo(e)
+        raise
+    duracion = time.monotonic() - inicio
+    SCRAPE_TIENDA.observar(duracion, tienda=tienda.id)
+    PRODUCTOS.set(len(products), tienda=tienda.id)
+    if products:
+        circuito.exito(duracion)
+    else:
+        SIN_PRODUCTOS.inc(tienda=tienda.id)
+        circuito.fallo("sin productos")
+
+    if products and ENRIQUECIMIENTO_ACTIVO:
+        # Peso, origen, proceso y tueste ya leídos de la página de cada producto; acá no se pide ninguna
+        # (puede ser un pedido, y el timeout de la tienda sale del p95 del listado), ver refrescar_tienda
+        products = enriquecedor.enriquecer(tienda, products, revisar=False)
+    # Una pasada vectorizada por refresco; /ranking?por=kg lee esta columna ya calculada
+    products = agregar_precio_kilo(products)
+
+    if products and not primer_scrape.is_set():
+        primer_scrape.set()
+        print(f"Primer scrape ({tienda.id}) a los {time.perf_counter() - INICIO_PROCESO:.1f}s del arranque")
+    if products:
+        executor_historial.submit(historial.guardar_snapshot, tienda.id, products)
+    return products
 
+
+def scrapear_compartido(tienda):
+    return scrapes_en_vuelo.hacer(tienda.id, lambda: scrapear_y_guardar(tienda))
+
+
+def refrescar_tienda(tienda):
+    """
+    Refresco del calentador: scrapea y deja el resultado en la cache. Las páginas de producto
+    nuevas o vencidas se piden sólo acá, en segundo plano y fuera del tiempo medido del scrape.
+    """
+    products = scrapear_compartido(tienda)
+    if products and ENRIQUECIMIENTO_ACTIVO:
+        products = agregar_precio_kilo(enriquecedor.enriquecer(tienda, products))
+    cache_precios.guardar(tienda.id, products)
     return products
 
-#normaliza mal el precio
-def search_AcademiaBaristas(driver):
-    url = "https://academiadebaristas.mitiendanube.com/cafe/"  # Página principal de los productos
-    driver.get(url)
-    products = []
 
-    try:
-        # Localizar todos los contenedores de productos
-        product_elements = driver.find_elements(By.CSS_SELECTOR, "div.js-item-product")
+# Con el calentador activo los pedidos sólo leen la cache; los scrapes ocurren en segundo plano
+CALENTADOR_ACTIVO = os.getenv("CALENTADOR_ACTIVO", "1") != "0"
+calentador = Calentador(REGISTRO.values(), refrescar_tienda)
 
-        for product in product_elements:
-                # Obtener el nombre del producto
-                name = product.find_element(By.CSS_SELECTOR, "div.js-item-name").text.strip()
+# Lo que cambió en cada refresco (nuevos, quitados, subas y bajas) se junta y sale en un solo
+# mensaje de Telegram cuando termina la vuelta del calentador
+diff_catalogo = DiffCatalogo()
+notificador = Notificador(diff_catalogo.cola)
+NOTIFICACIONES = NOTIFICADOR_ACTIVO and CALENTADOR_ACTIVO
+if NOTIFICACIONES:
+    cache_precios.suscribir(diff_catalogo.actualizar_tienda)
+    calentador.al_terminar_vuelta(notificador.vaciar)
 
-                # Obtener el precio del producto
-                price_text = product.find_element(By.CSS_SELECTOR, "span.js-price-display").text.strip()
-                price = normalize_price(price_text)
 
-                # Obtener la URL del producto
-                product_url = product.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
+def productos_tienda(tienda, refresh=False):
+    """
+    Productos de una tienda desde la cache. Con el calentador andando nunca se scrapea en el pedido,
+    salvo con refresh=1; sin calentador se scrapea si no hay nada guardado.
+    """
+    products, estado = leer_catalogo_tienda(tienda, refresh)
+    CACHE_CONSULTAS.inc(tienda=tienda.id, estado=estado)
+    return products, estado
 
-                # Agregar los datos al listado de productos
-                products.append({
-                    "name": name,
-                    "price": price,
-                    "url": product_url
-                })
 
+def leer_catalogo_tienda(tienda, refresh):
+    if calentador.activo() and not refresh:
+        return cache_precios.leer(tienda.id)
+    try:
+        return cache_precios.obtener(tienda.id, lambda: scrapear_compartido(tienda), refresh)
     except Exception as e:
-        print(f"Error al extraer los productos de Academia de baristas: {e}")
+        # Circuito abierto, sin navegadores, timeout de carga o cualquier otro error del scrape:
+        # se sirve el último catálogo conocido, si hay
+        products, _ = cache_precios.leer(tienda.id)
+        if not products:
+            raise
+        print(f"Error al scrapear {tienda.id}, se sirve la cache: {e}")
+        return products, "stale"
 
 
-    except Exception as e:
-        print(f"Error al extraer los productos: {e}")
+def pide_refresh():
+    return request.args.get("refresh") == "1"
 
-    return products
 
+@app.errorhandler(Saturado)
+def servicio_saturado(e):
+    return jsonify({"message": f"Servicio saturado, reintentá más tarde: {e}"}), 503, {"Retry-After": str(e.retry_after)}
 
-@app.route('/preciosAcademiaBaristas', methods=['GET'])
-def precios_AcademiaBaristas():
-    driver = setup_driver()
-    try:
-        products = search_AcademiaBaristas(driver)
-        if products:
-            return jsonify(products), 200
-        else:
-            return jsonify({"message": "No se encontraron productos en Fuego Tostadores."}), 404
-    finally:
-        driver.quit()
 
+@app.errorhandler(PoolAgotado)
+def sin_navegadores(e):
+    return jsonify({"message": f"No hay navegadores libres, reintentá más tarde: {e}"}), 503, {"Retry-After": str(max(int(driver_pool.espera), 1))}
 
-@app.route('/preciosMomo', methods=['GET'])
-def precios_Momo():
-    driver = setup_driver()
-    try:
-        # Llamar a la función de scraping y obtener los datos
-        products = search_MomoTostadores(driver)
-        if products:
-            return jsonify(products), 200  # Devuelve los productos en formato JSON
-        else:
-            return jsonify({"message": "No se encontraron productos."}), 404
-    finally:
-        driver.quit()  # Cerrar el driver una vez terminado el scraping
 
+@app.errorhandler(CircuitoAbierto)
+def tienda_caida(e):
+    return jsonify({"message": f"Tienda no disponible por ahora: {e}"}), 503, {"Retry-After": str(max(int(e.reintento_en), 1))}
 
-@app.route('/preciosPuertoBlest', methods=['GET'])
-def precios_puerto_blast():
-    driver = setup_driver()
-    try:
-        # Llamar a la función de scraping y obtener los productos
-        products = search_puerto_blast(driver)
+
+def crear_ruta_tienda(tienda):
+    """Arma la vista de /precios<Tienda> a partir de su definición en el registro."""
+    def precios_tienda():
+        try:
+            products, estado = productos_tienda(tienda, pide_refresh())
+        except (Saturado, PoolAgotado, CircuitoAbierto):
+            raise
+        except Exception as e:
+            # El scrape falló y no hay nada guardado para servir en su lugar
+            return jsonify({"message": f"No se pudo obtener el catálogo de {tienda.nombre}: {e}"}), 502
         if products:
-            return jsonify(products), 200  # Devuelve los productos en formato JSON
+            response = responder_versionado(products, vista_catalogo.version_tienda(tienda.id, products))
+            response.headers["X-Cache"] = estado
+            return response
+        elif estado == "pendiente":
+            mensaje = f"El catálogo de {tienda.nombre} se está preparando, reintentá en unos segundos."
+            return jsonify({"message": mensaje}), 503, {"Retry-After": str(int(tienda.timeout))}
         else:
-            return jsonify({"message": "No se encontraron productos en Café Puerto Blast."}), 404
-    finally:
-        driver.quit()  # Cerrar el driver una vez terminado el scraping
+            return jsonify({"message": f"No se encontraron productos en {tienda.nombre}."}), 404
+    return precios_tienda
 
 
-@app.route('/preciosFuego', methods=['GET'])
-def precios_fuego():
-    driver = setup_driver()
-    try:
-        products = search_coffee(driver)
-        if products:
-            return jsonify(products), 200
-        else:
-            return jsonify({"message": "No se encontraron productos en Fuego Tostadores."}), 404
-    finally:
-        driver.quit()
+# Una ruta por tienda registrada
+for tienda in REGISTRO.values():
+    app.add_url_rule(tienda.ruta, endpoint=f"precios_{tienda.id}", view_func=crear_ruta_tienda(tienda), methods=['GET'])
 
-@app.route('/preciosDelirante', methods=['GET'])
-def precios_delirante():
-    driver = setup_driver()
-    try:
-        products = search_delirante(driver)
-        if products:
-            return jsonify(products), 200
-        else:
-            return jsonify({"message": "No se encontraron productos en Café Delirante."}), 404
-    finally:
-        driver.quit()
 
-@app.route('/preciosAvo', methods=['GET'])
-def precios_avo():
-    driver = setup_driver()
-    try:
-        products = search_avo(driver)
-        if products:
-            return jsonify(products), 200
-        else:
-            return jsonify({"message": "No se encontraron productos en Avo Coffee Roasters."}), 404
-    finally:
-        driver.quit()
+def resultados_por_tienda(refresh):
+    """
+    Lanza todas las tiendas en paralelo y entrega (tienda, products, estado_cache, error)
+    a medida que cada una termina. Las que pasan su timeout salen con error "timeout".
+    """
+    inicio = time.monotonic()
+    # Plazos adaptativos (p95 de cada tienda), fijados al lanzar
+    plazos = {tienda.id: inicio + circuitos[tienda.id].timeout() for tienda in REGISTRO.values()}
+    pendientes = {executor_tiendas.submit(productos_tienda, tienda, refresh): tienda for tienda in REGISTRO.values()}
+
+    while pendientes:
+        proximo_vencimiento = min(plazos[tienda.id] for tienda in pendientes.values())
+        listos, _ = wait(pendientes, timeout=max(proximo_vencimiento - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+
+        for futuro in listos:
+            tienda = pendientes.pop(futuro)
+            try:
+                products, estado = futuro.result()
+            except Exception as e:
+                yield tienda, None, None, e
+            else:
+                yield tienda, products, estado, None
+
+        ahora = time.monotonic()
+        for futuro, tienda in list(pendientes.items()):
+            if plazos[tienda.id] <= ahora:
+                del pendientes[futuro]
+                yield tienda, None, None, "timeout"
+
+
+def describir_fallo(tienda, error):
+    if isinstance(error, Saturado):
+        return {"shop": tienda.id, "error": "saturado"}
+    if isinstance(error, PoolAgotado):
+        return {"shop": tienda.id, "error": "sin navegadores libres"}
+    if isinstance(error, CircuitoAbierto):
+        return {"shop": tienda.id, "error": "circuito abierto", "retry_in": round(error.reintento_en)}
+    return {"shop": tienda.id, "error": str(error)}
+
+
+def describir_vacia(tienda, estado):
+    """Una tienda que respondió sin productos: todavía sin su primer scrape ("pendiente") o vacía."""
+    return {"shop": tienda.id, "error": "en preparación" if estado == "pendiente" else "sin productos"}
+
+
+def consultar_tiendas(refresh=False):
+    """
+    Consulta todas las tiendas (cache, o scrape si hace falta) y devuelve (vista, failed_shops, cache, saturado).
+    Los productos salen de la vista precalculada, que la cache ya actualizó con lo que se haya scrapeado.
+    """
+    failed_shops = []
+    saturado = None
+    cache = {}
+    for tienda, products, estado, error in resultados_por_tienda(refresh):
+        if error is not None:
+            if isinstance(error, (Saturado, PoolAgotado)):
+                saturado = error
+            failed_shops.append(describir_fallo(tienda, error))
+            continue
+
+        cache[tienda.id] = estado
+        if not products:
+            failed_shops.append(describir_vacia(tienda, estado))
+
+    vista = vista_catalogo.actual()
+    # Sin nada para mostrar y con navegadores saturados: mejor que el cliente reintente
+    if saturado and not vista.products:
+        raise saturado
+    return vista, failed_shops, cache, saturado
+
+
+def responder_versionado(payload, version):
+    """Respuesta JSON con ETag; si el cliente ya tiene esa versión (If-None-Match) se devuelve 304 sin cuerpo."""
+    if request.if_none_match.contains(version):
+        response = Response(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(version)
+    return response
+
 
 @app.route('/productosCombinados', methods=['GET'])
 def productos_combinados():
-    driver = setup_driver()
+    refresh = pide_refresh()
+    if request.args.get("stream") == "1":
+        return Response(generar_ndjson(refresh), mimetype="application/x-ndjson")
+
+    vista, failed_shops, cache, _ = consultar_tiendas(refresh)
+    return responder_versionado({
+        "version": vista.version,
+        "products": vista.products,
+        "partial": bool(failed_shops),
+        "failed_shops": failed_shops,
+        "cache": cache,
+    }, vista.version)
+
+
+@app.route('/productos/cambios', methods=['GET'])
+def productos_cambios():
+    desde = request.args.get("since")
+    if not desde:
+        return jsonify({"message": "Falta el parámetro since (versión que ya tiene el cliente)."}), 400
+
+    vista, failed_shops, _, _ = consultar_tiendas()
+    cambios = catalogo.cambios(desde, vista.version)
+    if cambios is None:
+        # Versión desconocida: el cliente tiene que tomar el catálogo completo
+        cambios = {"added": vista.products, "removed": [], "repriced": [], "reset": True}
+    return jsonify({
+        "version": vista.version,
+        "since": desde,
+        "partial": bool(failed_shops),
+        **cambios,
+    }), 200
+
+
+def generar_ndjson(refresh):
+    """
+    Modo ?stream=1: una línea JSON por producto, emitida apenas termina su tienda,
+    y al final una línea de resumen. Nunca se arma la lista combinada completa.
+    """
+    total = 0
+    failed_shops = []
+    cache = {}
+    for tienda, products, estado, error in resultados_por_tienda(refresh):
+        if error is not None:
+            failed_shops.append(describir_fallo(tienda, error))
+            continue
+
+        cache[tienda.id] = estado
+        if not products:
+            failed_shops.append(describir_vacia(tienda, estado))
+        for product in products:
+            total += 1
+            linea = {"type": "product", "shop": tienda.id, **product, "id": id_publico(product["url"])}
+            yield json.dumps(linea, ensure_ascii=False) + "\n"
+
+    resumen = {
+        "type": "summary",
+        "total": total,
+        "partial": bool(failed_shops),
+        "failed_shops": failed_shops,
+        "cache": cache,
+    }
+    yield json.dumps(resumen, ensure_ascii=False) + "\n"
+
+
+def leer_entero(parametro, por_defecto=None, minimo=0, maximo=None):
+    valor = request.args.get(parametro)
+    if valor in (None, ""):
+        return por_defecto
+    numero = int(float(valor))
+    if numero < minimo or (maximo is not None and numero > maximo):
+        raise ValueError(f"{parametro} fuera de rango")
+    return numero
+
+
+def catalogo_indexado(clave="price"):
+    """Índice ya ordenado por `clave` de la vista actual. Devuelve (version, indice, parcial)."""
+    vista, failed_shops, _, _ = consultar_tiendas()
+    return vista.version, vista.indices[clave], bool(failed_shops)
+
+
+@app.route('/productos', methods=['GET'])
+def productos_por_rango():
+    try:
+        minimo = leer_entero("min")
+        maximo = leer_entero("max")
+        limit = leer_entero("limit", por_defecto=50, maximo=1000)
+        offset = leer_entero("offset", por_defecto=0)
+    except ValueError:
+        return jsonify({"message": "min, max, limit y offset deben ser números positivos."}), 400
+
+    version, indice, parcial = catalogo_indexado()
+    total, products = indice.rango(minimo, maximo, limit, offset)
+    return responder_versionado({
+        "version": version,
+        "partial": parcial,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "products": products,
+    }, version)
+
+
+@app.route('/productos/top', methods=['GET'])
+def productos_top():
+    orden = request.args.get("orden", "asc")
+    if orden not in ("asc", "desc"):
+        return jsonify({"message": "orden debe ser asc o desc."}), 400
     try:
-        # Obtener productos de todas las rutas
-        fuego_products = search_coffee(driver)
-        delirante_products = search_delirante(driver)
-        avo_products = search_avo(driver)
-        puerto_blast_products = search_puerto_blast(driver)
-        momo_tostadores = search_MomoTostadores(driver)
-        academia_baristas = search_AcademiaBaristas(driver)
+        k = leer_entero("k", por_defecto=3, minimo=1, maximo=100)
+    except ValueError:
+        return jsonify({"message": "k debe ser un número entre 1 y 100."}), 400
+
+    version, indice, parcial = catalogo_indexado()
+    return responder_versionado({
+        "version": version,
+        "partial": parcial,
+        "orden": orden,
+        "k": k,
+        "products": indice.top(k, orden),
+    }, version)
+
 
-        # Combinar todos los productos
-        all_products = fuego_products + delirante_products + avo_products + puerto_blast_products + momo_tostadores + academia_baristas
+# Criterios de /ranking: la clave del índice y de los filtros min/max
+RANKINGS = {"precio": "price", "kg": "price_per_kg"}
 
-        # Añadir el campo 'id' autoincremental
-        for idx, product in enumerate(all_products, start=1):
-            product['id'] = idx  # Asignar un ID único
 
-        return jsonify(all_products), 200
-    finally:
-        driver.quit()  # Cerrar el driver una vez terminado el scraping
+@app.route('/ranking', methods=['GET'])
+def ranking():
+    """
+    Los k productos más baratos (o más caros) por precio o por precio por kilo, con min y max sobre
+    ese mismo valor. Sale de un índice ya ordenado; los productos sin peso no entran al ranking por kilo.
+    """
+    por = request.args.get("por", "kg")
+    orden = request.args.get("orden", "asc")
+    if por not in RANKINGS:
+        return jsonify({"message": f"por debe ser uno de: {', '.join(RANKINGS)}."}), 400
+    if orden not in ("asc", "desc"):
+        return jsonify({"message": "orden debe ser asc o desc."}), 400
+    try:
+        k = leer_entero("k", por_defecto=10, minimo=1, maximo=100)
+        minimo = leer_entero("min")
+        maximo = leer_entero("max")
+    except ValueError:
+        return jsonify({"message": "k debe ser un número entre 1 y 100; min y max, números positivos."}), 400
+
+    version, indice, parcial = catalogo_indexado(RANKINGS[por])
+    total, products = indice.rango(minimo, maximo, limit=k, orden=orden)
+    return responder_versionado({
+        "version": version,
+        "partial": parcial,
+        "por": por,
+        "orden": orden,
+        "k": k,
+        "total": total,
+        "products": products,
+    }, version)
+
+
+@app.route('/buscar', methods=['GET'])
+def buscar():
+    consulta = request.args.get("q", "").strip()
+    if not consulta:
+        return jsonify({"message": "Falta el parámetro q."}), 400
+    try:
+        limit = leer_entero("limit", por_defecto=20, minimo=1, maximo=200)
+    except ValueError:
+        return jsonify({"message": "limit debe ser un número entre 1 y 200."}), 400
+    return jsonify({"q": consulta, "results": indice_busqueda.buscar(consulta, limit)}), 200
+
+
+@app.route('/status', methods=['GET'])
+def status():
+    """Último refresco, duración y próximo turno de cada tienda, la cola de la frontera y el estado de cache y navegadores."""
+    return jsonify({
+        "calentador": calentador.activo(),
+        "tiendas": calentador.estado(),
+        "frontera": calentador.frontera.estado(),
+        "circuitos": circuitos.estado(),
+        "notificador": notificador.estado(),
+        "cache": cache_precios.estado(),
+        "navegadores": driver_pool.estado(),
+        "admision": admision_navegadores.estado(),
+        "scrapes_en_vuelo": scrapes_en_vuelo.en_vuelo(),
+    }), 200
+
+
+@app.route('/circuitos', methods=['GET'])
+def estado_circuitos():
+    """Estado del circuit breaker, p95 y timeout vigente de cada tienda."""
+    return jsonify(circuitos.estado()), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(METRICAS.exponer(), mimetype=None, content_type=CONTENT_TYPE)
+
+
+def leer_fecha(parametro):
+    valor = request.args.get(parametro)
+    return datetime.fromisoformat(valor) if valor else None
+
+
+@app.route('/historial', methods=['GET'])
+def historial_producto():
+    url = request.args.get("url")
+    if not url:
+        return jsonify({"message": "Falta el parámetro url."}), 400
+    try:
+        tramos = historial.historial_producto(url, leer_fecha("desde"), leer_fecha("hasta"))
+    except ValueError:
+        return jsonify({"message": "Las fechas deben tener formato ISO (AAAA-MM-DD)."}), 400
+    except Error as e:
+        return jsonify({"message": f"Error al consultar el historial: {e}"}), 503
+    return jsonify({"url": url, "intervals": tramos}), 200
+
+
+@app.route('/historial/tienda/<shop>', methods=['GET'])
+def historial_tienda(shop):
+    if shop not in REGISTRO:
+        return jsonify({"message": f"Tienda desconocida: {shop}"}), 404
+    try:
+        tramos = historial.historial_tienda(shop, leer_fecha("desde"), leer_fecha("hasta"))
+    except ValueError:
+        return jsonify({"message": "Las fechas deben tener formato ISO (AAAA-MM-DD)."}), 400
+    except Error as e:
+        return jsonify({"message": f"Error al consultar el historial: {e}"}), 503
+    return jsonify({"shop": shop, "intervals": tramos}), 200
+
+
+@app.route('/historial/resumen', methods=['GET'])
+def resumen_producto():
+    url = request.args.get("url")
+    if not url:
+        return jsonify({"message": "Falta el parámetro url."}), 400
+    paso = request.args.get("paso", "dia")
+    try:
+        series = historial.resumen_producto(url, paso, leer_fecha("desde"), leer_fecha("hasta"))
+    except ValueError as e:
+        return jsonify({"message": f"Parámetros inválidos: {e}"}), 400
+    except Error as e:
+        return jsonify({"message": f"Error al consultar el historial: {e}"}), 503
+    return jsonify({"url": url, "paso": paso, "series": series}), 200
+
+
+@app.route('/historial/tienda/<shop>/resumen', methods=['GET'])
+def resumen_tienda(shop):
+    if shop not in REGISTRO:
+        return jsonify({"message": f"Tienda desconocida: {shop}"}), 404
+    paso = request.args.get("paso", "dia")
+    try:
+        productos = historial.resumen_tienda(shop, paso, leer_fecha("desde"), leer_fecha("hasta"))
+    except ValueError as e:
+        return jsonify({"message": f"Parámetros inválidos: {e}"}), 400
+    except Error as e:
+        return jsonify({"message": f"Error al consultar el historial: {e}"}), 503
+    return jsonify({"shop": shop, "paso": paso, "products": productos}), 200
 
 if __name__ == "__main__":
+    # chromedriver se resuelve acá, una vez; los pedidos ya no tocan disco ni red para encontrarlo
+    ruta_chromedriver()
+    driver_pool.iniciar()
+    print(f"Arranque listo en {time.perf_counter() - INICIO_PROCESO:.1f}s")
+    if CALENTADOR_ACTIVO:
+        edades = {tienda_id: info["edad_segundos"] for tienda_id, info in cache_precios.estado().items()}
+        calentador.iniciar(edades)
+        atexit.register(calentador.detener)
+    if not NOTIFICACIONES:
+        print("Notificaciones de cambios del catálogo desactivadas (hacen falta TELEGRAM_TOKEN y el calentador)")
+    atexit.register(driver_pool.cerrar)
     app.run(host='0.0.0.0', port=5002)
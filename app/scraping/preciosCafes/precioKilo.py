@@ -0,0 +1,50 @@
+import os
+import re
+
+import pandas as pd
+
+from enriquecimiento import PATRON_PESO
+
+# Precio por kilo: compara bolsas de 250g con bolsas de 1kg. Se calcula una vez por refresco de
+# cada tienda, en una sola pasada vectorizada, y queda guardado en la cache como price_per_kg.
+
+# Pesos fuera de este rango (gramos) son casi seguro una mala lectura ("Kit x 12", "Cápsulas 5g")
+PESO_MINIMO = int(os.getenv("PESO_MINIMO", "100"))
+PESO_MAXIMO = int(os.getenv("PESO_MAXIMO", "5000"))
+
+
+def _gramos_de_nombres(nombres):
+    """Misma lectura que enriquecimiento.gramos, pero sobre toda la columna de nombres a la vez."""
+    partes = nombres.str.extract(PATRON_PESO.pattern, flags=re.IGNORECASE)
+    numero = partes[1].fillna(partes[3])
+    unidad = partes[2].str.lower().fillna("kg").where(partes[1].notna() | partes[3].notna())
+
+    fraccion = numero.str.extract(r"^(\d+)/(\d+)$").astype(float)
+    valor = pd.to_numeric(numero.str.replace(",", ".", regex=False), errors="coerce")
+    valor = valor.fillna(fraccion[0] / fraccion[1].where(fraccion[1] > 0))
+    valor = valor * pd.to_numeric(partes[0], errors="coerce").fillna(1)
+    return valor.where(~unidad.str.startswith("k", na=False), valor * 1000)
+
+
+def agregar_precio_kilo(products):
+    """
+    Copias de los productos con weight_g (si faltaba y el nombre lo dice) y price_per_kg.
+    El peso del enriquecimiento manda; sin un peso creíble price_per_kg queda en None.
+    """
+    if not products:
+        return []
+    tabla = pd.DataFrame({
+        "price": pd.to_numeric(pd.Series([product["price"] for product in products]), errors="coerce"),
+        "weight_g": pd.to_numeric(pd.Series([product.get("weight_g") for product in products], dtype=object),
+                                  errors="coerce"),
+        "name": pd.Series([product["name"] for product in products], dtype=str),
+    })
+    peso = tabla["weight_g"].fillna(_gramos_de_nombres(tabla["name"])).round()
+    por_kilo = (tabla["price"] * 1000 / peso.where(peso.between(PESO_MINIMO, PESO_MAXIMO))).round()
+
+    pesos = peso.astype("Int64").astype(object).where(peso.notna(), None).tolist()
+    precios = por_kilo.astype("Int64").astype(object).where(por_kilo.notna(), None).tolist()
+    return [
+        {**product, "weight_g": peso_g, "price_per_kg": precio}
+        for product, peso_g, precio in zip(products, pesos, precios)
+    ]
@@ -0,0 +1,49 @@
+import hashlib
+import re
+
+
+def normalize_price(price):
+    """
+    Normaliza el precio eliminando caracteres no numéricos excepto el punto.
+    Convierte el precio a un número flotante para consistencia.
+    """
+    price_cleaned = re.sub(r'[^\d]', '', price)  # Elimina caracteres no numéricos
+    return int(price_cleaned)
+
+
+def armar_productos(filas):
+    """Convierte filas (nombre, texto del precio, url) en productos; descarta las que no tienen precio."""
+    products = []
+    for name, price_text, url in filas:
+        try:
+            price = normalize_price(price_text)
+        except ValueError:
+            continue
+        products.append({
+            "name": name.strip(),
+            "price": price,
+            "url": url
+        })
+    return products
+
+
+def productos_crudos(filas):
+    """Filas (nombre, texto del precio, url) como productos con el precio tal como lo muestra la tienda."""
+    return [{"name": name, "price": price_text, "url": url} for name, price_text, url in filas]
+
+
+def deduplicar(products):
+    """Quita productos repetidos por URL (ej. destacados que aparecen en varias páginas), manteniendo el orden."""
+    vistos = set()
+    unicos = []
+    for product in products:
+        if product["url"] in vistos:
+            continue
+        vistos.add(product["url"])
+        unicos.append(product)
+    return unicos
+
+
+def id_producto(url):
+    """ID estable de un producto: los primeros 8 bytes del SHA-1 de su URL (entra en un BIGINT UNSIGNED)."""
+    return int.from_bytes(hashlib.sha1(url.encode("utf-8")).digest()[:8], "big")
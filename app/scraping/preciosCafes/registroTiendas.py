@@ -0,0 +1,199 @@
+import json
+import os
+from urllib.parse import urlparse
+
+import requests
+import soupsieve
+
+from extraccionDom import buscar_selenium, extraer_enlaces_dom
+from metricas import CARGA_PAGINA, EXTRACCION
+from motorApi import ApiNoDisponible, buscar_woocommerce, extraer_tiendanube
+from motorHtml import HTTP_TIMEOUT, descargar, extraer_enlaces, extraer_filas, parsear
+from paginacion import descargar_paginas, urls_restantes
+from productos import armar_productos, deduplicar, productos_crudos
+
+# Definiciones de tiendas. Agregar una tienda nueva es agregar una entrada a este archivo.
+TIENDAS_PATH = os.getenv("TIENDAS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tiendas.json"))
+
+# Tiempo máximo (segundos) que se espera a cada tienda antes de responder sin ella
+SHOP_TIMEOUT = float(os.getenv("SHOP_TIMEOUT", "45"))
+
+# Cada cuánto (segundos) el calentador vuelve a scrapear una tienda; menos que el TTL de la cache
+REFRESCO_INTERVALO = float(os.getenv("REFRESCO_INTERVALO", "10800"))
+
+
+class Tienda:
+    """
+    Una tienda del registro, ya "compilada": los selectores CSS se compilan una sola vez
+    y la misma definición sirve para el motor HTML y para Selenium.
+
+    Campos de la definición:
+    - id, nombre, ruta: identificador interno, nombre para mostrar y ruta de la API.
+    - urls: listados a scrapear.
+    - selectores: nombre, precio, enlace y opcionalmente tarjeta.
+      Sin "tarjeta" se combinan en orden las listas de nombres, precios y enlaces;
+      con "tarjeta" se buscan dentro de cada producto ("enlace": null = la tarjeta es el <a>).
+    - paginacion: regla de paginación del listado (null si tiene una sola página), ver paginacion.py.
+      La cantidad de páginas se descubre en la primera y el resto se descarga en paralelo.
+    - api: opcional, datos estructurados de la tienda (ver motorApi.py):
+      {"tipo": "woocommerce", "base": ..., "categoria": slug} o {"tipo": "tiendanube"}.
+    - motor: "api" (la API, con el DOM de respaldo), "html" (requests + parser, con Selenium
+      de respaldo) o "selenium". Se puede cambiar con MOTOR_<ID>.
+    - timeout: opcional, se puede cambiar con SHOP_TIMEOUT_<ID>.
+    - intervalo: opcional, segundos entre refrescos en segundo plano; se puede cambiar con REFRESCO_<ID>.
+    - detalle: opcional, {"descripcion": selector} de la ficha en la página de cada producto (ver enriquecimiento.py).
+    - prioridad: opcional, se suma a la tasa de cambios de precios para ordenar la frontera (ver frontera.py).
+    """
+
+    def __init__(self, definicion):
+        self.id = definicion["id"]
+        self.nombre = definicion["nombre"]
+        self.ruta = definicion["ruta"]
+        self.urls = definicion["urls"]
+        self.selectores = definicion["selectores"]
+        self.paginacion = definicion.get("paginacion")
+        self.api = definicion.get("api")
+        self.detalle = definicion.get("detalle")
+        self.motor = os.getenv(f"MOTOR_{self.id.upper()}", definicion.get("motor", "selenium"))
+        self.timeout = float(os.getenv(f"SHOP_TIMEOUT_{self.id.upper()}", definicion.get("timeout", SHOP_TIMEOUT)))
+        self.intervalo = float(os.getenv(f"REFRESCO_{self.id.upper()}", definicion.get("intervalo", REFRESCO_INTERVALO)))
+        self.prioridad = float(definicion.get("prioridad", 0))
+        self.dominio = urlparse(self.urls[0]).netloc
+
+        self._css = {
+            clave: soupsieve.compile(selector)
+            for clave, selector in self.selectores.items()
+            if selector
+        }
+        self._css_paginacion = soupsieve.compile(self.paginacion["selector"]) if self.paginacion else None
+        # Se usa en cada página de producto que revisa el enriquecimiento
+        descripcion = (self.detalle or {}).get("descripcion")
+        self.css_detalle = soupsieve.compile(descripcion) if descripcion else None
+
+    def buscar_html(self, timeout=HTTP_TIMEOUT, extraer=None, motor="html"):
+        """
+        Scrapea la tienda sin navegador: una descarga y un parseo por página del listado.
+        Si alguna página no se puede descargar levanta la excepción de requests, no devuelve un catálogo a medias.
+        `extraer(soup, url)` cambia cómo se leen los productos de cada página (ej. el JSON de Tiendanube).
+        """
+        extraer = extraer or (lambda soup, url: armar_productos(extraer_filas(soup, self._css, url)))
+        products = []
+        for url in self.urls:
+            products.extend(self._listado_html(url, timeout, extraer, motor))
+        return deduplicar(products)
+
+    def _listado_html(self, url, timeout, extraer, motor):
+        html = self._descargar_html(url, timeout, motor)
+        with EXTRACCION.cronometrar(tienda=self.id, motor=motor):
+            soup = parsear(html)
+            products = extraer(soup, url)
+        if self.paginacion:
+            restantes = urls_restantes(url, self.paginacion, extraer_enlaces(soup, self._css_paginacion))
+            products.extend(descargar_paginas(restantes, lambda pagina: self._pagina_html(pagina, timeout, extraer, motor)))
+        return products
+
+    def _pagina_html(self, url, timeout, extraer, motor):
+        html = self._descargar_html(url, timeout, motor)
+        with EXTRACCION.cronometrar(tienda=self.id, motor=motor):
+            return extraer(parsear(html), url)
+
+    def _descargar_html(self, url, timeout, motor):
+        # Un error en cualquier página hace fallar todo el scrape: un catálogo al que le falta una página
+        # parece completo, pisaría la cache y cerraría en el historial los precios de lo que no se vio
+        with CARGA_PAGINA.cronometrar(tienda=self.id, motor=motor):
+            return descargar(url, timeout)
+
+    def buscar_api(self, timeout=HTTP_TIMEOUT):
+        """Productos desde los datos estructurados de la tienda, con precio de lista, stock y variantes."""
+        if not self.api:
+            raise ApiNoDisponible(f"{self.id} no tiene API configurada")
+        if self.api["tipo"] == "woocommerce":
+            with CARGA_PAGINA.cronometrar(tienda=self.id, motor="api"):
+                return deduplicar(buscar_woocommerce(self.api, timeout))
+        if self.api["tipo"] == "tiendanube":
+            return self.buscar_html(timeout, lambda soup, url: extraer_tiendanube(soup, url, self.api), motor="api")
+        raise ApiNoDisponible(f"Tipo de API desconocido: {self.api['tipo']}")
+
+    def buscar_selenium(self, driver, crudo=False):
+        """
+        Scrapea todas las páginas con un único driver (lo usan los scripts de scrapPaginasCafe/).
+        Con `crudo` el precio queda como el texto de la página ("$ 12.500"), como respondían esos scripts.
+        """
+        armar = productos_crudos if crudo else armar_productos
+        products = []
+        for url in self.urls:
+            products.extend(buscar_selenium(driver, url, self.selectores, self.id, armar))
+            for pagina in self._paginas_dom(driver, url):
+                products.extend(buscar_selenium(driver, pagina, self.selectores, self.id, armar, primera=False))
+        return deduplicar(products)
+
+    def _buscar_selenium_pool(self, driver_pool, timeout):
+        # La primera página de cada listado define cuántas hay; el resto va en paralelo,
+        # cada una con su driver. El primero se devuelve antes para no bloquear el pool.
+        # Los drivers del pool se comparten: cada uso fija el timeout de carga de esta tienda.
+        products = []
+        restantes = []
+        with driver_pool.driver() as driver:
+            driver.set_page_load_timeout(timeout)
+            for url in self.urls:
+                products.extend(buscar_selenium(driver, url, self.selectores, self.id))
+                restantes.extend(self._paginas_dom(driver, url))
+
+        def pagina(url):
+            with driver_pool.driver() as driver:
+                driver.set_page_load_timeout(timeout)
+                return buscar_selenium(driver, url, self.selectores, self.id, primera=False)
+
+        products.extend(descargar_paginas(restantes, pagina))
+        return deduplicar(products)
+
+    def _paginas_dom(self, driver, url):
+        if not self.paginacion:
+            return []
+        enlaces = extraer_enlaces_dom(driver, self.paginacion["selector"])
+        return urls_restantes(url, self.paginacion, enlaces)
+
+    def scrapear(self, driver_pool, timeout=None):
+        """
+        Scrapea la tienda con su motor. El motor "api" lee los datos estructurados y si no
+        responden se cae al DOM; el motor "html" no abre navegador y si no encuentra productos
+        se cae a Selenium con drivers del pool.
+        `timeout` (por defecto el de la tienda) acota cada descarga o carga de página.
+        Una página que no carga, o una página siguiente sin productos, hace fallar el scrape entero
+        (excepción), nunca un catálogo con páginas de menos.
+        """
+        timeout = timeout or self.timeout
+        if self.motor == "api":
+            try:
+                products = self.buscar_api(min(timeout, HTTP_TIMEOUT))
+            except (ApiNoDisponible, requests.RequestException, ValueError) as e:
+                print(f"{self.id}: la API no respondió ({e}), se scrapea el DOM")
+                products = None
+            if products:
+                return products
+            if products is not None:
+                print(f"{self.id}: la API no devolvió productos, se scrapea el DOM")
+
+        if self.motor in ("api", "html"):
+            try:
+                products = self.buscar_html(min(timeout, HTTP_TIMEOUT))
+            except requests.RequestException as e:
+                print(f"{self.id}: error al descargar el listado ({e}), se usa Selenium")
+                products = None
+            if products:
+                return products
+            if products is not None:
+                print(f"{self.id}: el motor HTML no encontró productos, se usa Selenium")
+
+        return self._buscar_selenium_pool(driver_pool, timeout)
+
+
+def cargar_registro(path=TIENDAS_PATH):
+    """Lee las definiciones y devuelve {id: Tienda}, respetando el orden del archivo."""
+    with open(path, "r", encoding="utf-8") as f:
+        definiciones = json.load(f)
+    return {definicion["id"]: Tienda(definicion) for definicion in definiciones}
+
+
+# Se carga una sola vez, al importar el módulo (arranque del proceso)
+REGISTRO = cargar_registro()
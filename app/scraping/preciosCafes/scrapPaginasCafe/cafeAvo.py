@@ -1,48 +1,28 @@
 from flask import Flask, jsonify
-from selenium import webdriver
-from selenium.webdriver import Chrome
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import os
+import sys
+
+# El registro de tiendas se comparte con precioApi.py (carpeta padre)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from registroTiendas import REGISTRO
+# Perfil de scraping compartido (app/scraping)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from perfilScraping import iniciar_chrome
+from resolverDriver import servicio_chrome
 
 app = Flask(__name__)
 
 def setup_driver():
-    service = Service(ChromeDriverManager().install())
+    service = servicio_chrome()
     options = Options()
     options.add_argument("--window-size=1250,850")
-    options.add_argument("--headless")  # Ejecutar en segundo plano sin abrir ventana del navegador
-    return webdriver.Chrome(service=service, options=options)
+    # Headless, carga eager y sin imágenes, fuentes ni scripts de terceros
+    return iniciar_chrome(service, options)
 
 def search_coffee(driver):
-    url = "https://www.avocoffeeroasters.com.ar/cafe--prod--1"
-    driver.get(url)
-    products = []
-    try:
-        # Encuentra todos los divs con clase "price" y los spans dentro
-        price_spans = driver.find_elements(By.CSS_SELECTOR, "div.price > span")
-        product_links = driver.find_elements(By.CSS_SELECTOR, "h4 > a.titprod")
-
-        if not price_spans or not product_links:
-            print("No se encontraron precios o enlaces de productos.")
-            return []
-
-        for idx, (span, product_link) in enumerate(zip(price_spans, product_links)):
-            product_name = product_link.text
-            product_href = product_link.get_attribute("href")
-            price = span.text
-
-            # Agregar los datos al arreglo de productos
-            products.append({
-                "name": product_name,
-                "price": price,
-                "url": product_href
-            })
-    except Exception as e:
-        print("Error al extraer información de la página:", e)
-
-    return products
+    # Misma definición (URL, selectores) que usa precioApi.py; el precio queda como texto de la página
+    return REGISTRO["avo"].buscar_selenium(driver, crudo=True)
 
 @app.route('/preciosAvo', methods=['GET'])
 def precios_avo():
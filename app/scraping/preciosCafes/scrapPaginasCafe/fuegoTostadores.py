@@ -1,49 +1,29 @@
 from flask import Flask, request, jsonify
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import json
+import os
+import sys
+
+# El registro de tiendas se comparte con precioApi.py (carpeta padre)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from registroTiendas import REGISTRO
+# Perfil de scraping compartido (app/scraping)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from perfilScraping import iniciar_chrome
+from resolverDriver import servicio_chrome
 
 app = Flask(__name__)
 
 # Inicializar Selenium y hacer scraping
 def setup_driver():
-    service = Service(ChromeDriverManager().install())
+    service = servicio_chrome()
     options = Options()
-    options.add_argument("--headless")  # Ejecutar en segundo plano sin abrir ventana del navegador
-    return webdriver.Chrome(service=service, options=options)
+    # Headless, carga eager y sin imágenes, fuentes ni scripts de terceros
+    return iniciar_chrome(service, options)
 
 def search_coffee(driver):
-    url = "https://fuegotostadores.com/cafe-de-especialidad/"
-    driver.get(url)
-    products = []
-    try:
-        # Obtener los elementos de precio, título y enlaces
-        price_spans = driver.find_elements(By.CSS_SELECTOR, "span.js-price-display.item-price")
-        product_titles = driver.find_elements(By.CSS_SELECTOR, "a.js-item-name.item-name")
-        product_links = driver.find_elements(By.CSS_SELECTOR, "a.js-item-name.item-name")
-
-        if not price_spans or not product_titles or not product_links:
-            print("No se encontraron precios, nombres o enlaces de productos.")
-            return []
-
-        for idx, (span, title, product_link) in enumerate(zip(price_spans, product_titles, product_links)):
-            product_name = title.text
-            product_href = product_link.get_attribute("href")
-            price = span.text
-
-            # Agregar los datos al arreglo de productos
-            products.append({
-                "name": product_name,
-                "price": price,
-                "url": product_href
-            })
-    except Exception as e:
-        print("Error al extraer información de la página:", e)
-
-    return products
+    # Misma definición (URL, selectores) que usa precioApi.py; el precio queda como texto de la página
+    return REGISTRO["fuego"].buscar_selenium(driver, crudo=True)
 
 
 @app.route('/preciosFuego', methods=['GET'])
@@ -1,56 +1,30 @@
 from flask import Flask, request, jsonify
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import json
+import os
+import sys
+
+# El registro de tiendas se comparte con precioApi.py (carpeta padre)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from registroTiendas import REGISTRO
+# Perfil de scraping compartido (app/scraping)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from perfilScraping import iniciar_chrome
+from resolverDriver import servicio_chrome
 
 app = Flask(__name__)
 
 # Inicializar Selenium y hacer scraping
 def setup_driver():
-    service = Service(ChromeDriverManager().install())
+    service = servicio_chrome()
     options = Options()
     options.add_argument("--window-size=1250,850")
-    options.add_argument("--headless")  # Ejecutar en segundo plano sin abrir ventana del navegador
-    return webdriver.Chrome(service=service, options=options)
+    # Headless, carga eager y sin imágenes, fuentes ni scripts de terceros
+    return iniciar_chrome(service, options)
 
 def search_MomoTostadores(driver):
-    url = "https://momotostadores.com/"  
-    driver.get(url)
-    products = []
-
-    try:
-        # Buscar los enlaces de los productos
-        product_links = driver.find_elements(By.CSS_SELECTOR, "a.pp-loop-product__link")
-        price_elements = driver.find_elements(By.CSS_SELECTOR, "span.price > span.woocommerce-Price-amount.amount bdi")
-
-        if not product_links or not price_elements:
-            print("No se encontraron productos o precios en la página.")
-            return []
-
-        # Iterar sobre los productos encontrados
-        for product_link, price_element in zip(product_links, price_elements):
-            product_name = product_link.find_element(By.CSS_SELECTOR, "h3.woocommerce-loop-product__title").text
-            product_url = product_link.get_attribute("href")
-            price = price_element.text.strip()  # Obtener texto del precio desde el <bdi>
-
-            # Normalizar el precio
-            normalized_price = (price)
-
-            # Guardar los productos encontrados
-            products.append({
-                "name": product_name,
-                "price": normalized_price,
-                "url": product_url
-            })
-
-    except Exception as e:
-        print(f"Error al extraer los productos de Momo Tostadores: {e}")
-
-    return products
-
+    # Misma definición (URL, selectores) que usa precioApi.py; el precio queda como texto de la página
+    return REGISTRO["momo"].buscar_selenium(driver, crudo=True)
 
 
 @app.route('/preciosMomo', methods=['GET'])
@@ -5,7 +5,10 @@ url = "http://localhost:5002/productosCombinados"
 response = requests.get(url)
 
 if response.status_code == 200:
-    productos = response.json()
+    data = response.json()
+    productos = data["products"]
+    if data["partial"]:
+        print(f"Atención: catálogo parcial, faltan {[f['shop'] for f in data['failed_shops']]}")
 
     segmentados = {
         "Brasil": [],
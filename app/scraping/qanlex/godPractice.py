@@ -1,16 +1,20 @@
 import logging
+import os
+import sys
 from typing import Optional
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+
+# Shared chromedriver resolution (app/scraping)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from resolverDriver import servicio_chrome
 
 class WebScraper:
     """
@@ -58,7 +62,7 @@ class WebScraper:
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
 
-        service = Service(ChromeDriverManager().install())
+        service = servicio_chrome()
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         return self.driver
 
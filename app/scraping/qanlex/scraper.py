@@ -1,25 +1,28 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import StaleElementReferenceException
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import json
 from datetime import datetime
 import os
+import sys
 import time
 
+# Resolución de chromedriver compartida con el resto de los scrapers (app/scraping)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from resolverDriver import servicio_chrome
+
 def setup_driver():
     """Configura y retorna el driver de Selenium con opciones predeterminadas para evitar problemas de ejecución en contenedores."""
     chrome_options = Options()
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
 
-    service = Service(ChromeDriverManager().install())
+    service = servicio_chrome()
     driver = webdriver.Chrome(service=service, options=chrome_options)
     return driver
 
@@ -0,0 +1,47 @@
+import os
+import shutil
+import time
+from functools import lru_cache
+
+from selenium.webdriver.chrome.service import Service
+
+# Binario que instala el Dockerfile
+CHROMEDRIVER_DOCKER = "/usr/local/bin/chromedriver"
+
+
+def _ejecutable(ruta):
+    return bool(ruta) and os.path.isfile(ruta) and os.access(ruta, os.X_OK)
+
+
+@lru_cache(maxsize=None)
+def ruta_chromedriver():
+    """
+    Ruta del chromedriver, resuelta una sola vez por proceso. En orden:
+    CHROMEDRIVER_PATH, el binario del Dockerfile, el que esté en el PATH y, como último
+    recurso, ChromeDriverManager (el único paso que puede salir a la red).
+    """
+    inicio = time.perf_counter()
+    configurada = os.getenv("CHROMEDRIVER_PATH")
+    if configurada and not _ejecutable(configurada):
+        print(f"CHROMEDRIVER_PATH={configurada} no existe o no es ejecutable; se busca otro chromedriver")
+
+    candidatos = [
+        ("CHROMEDRIVER_PATH", configurada),
+        ("Dockerfile", CHROMEDRIVER_DOCKER),
+        ("PATH", shutil.which("chromedriver")),
+    ]
+    for origen, ruta in candidatos:
+        if _ejecutable(ruta):
+            break
+    else:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        origen, ruta = "ChromeDriverManager", ChromeDriverManager().install()
+
+    print(f"chromedriver resuelto desde {origen} en {(time.perf_counter() - inicio) * 1000:.0f}ms: {ruta}")
+    return ruta
+
+
+def servicio_chrome():
+    """Service de Selenium con el chromedriver ya resuelto; no toca disco ni red después de la primera vez."""
+    return Service(ruta_chromedriver())